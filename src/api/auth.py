@@ -4,9 +4,10 @@
 
 import logging
 import secrets
+import sys
 import time
 import hashlib
-from typing import Optional, Dict, List, Set, Any
+from typing import Optional, Dict, List, Set, FrozenSet, Iterable, Tuple, Any
 from dataclasses import dataclass, field
 from collections import defaultdict
 from datetime import datetime, timedelta
@@ -16,6 +17,52 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Permissions granted implicitly by 'admin'
+_ADMIN_IMPLIED_PERMISSIONS = frozenset(('read', 'write'))
+
+# Pre-encoded bodies for the static rejection responses
+_AUTHORIZATION_REQUIRED_BODY = json.dumps({
+    'status': 'error',
+    'error_code': 'AUTHORIZATION_REQUIRED',
+    'error_message': 'API key is required'
+}).encode()
+_IP_BLOCKED_BODY = json.dumps({
+    'status': 'error',
+    'error_code': 'IP_BLOCKED',
+    'error_message': 'Too many failed authentication attempts'
+}).encode()
+_INVALID_API_KEY_BODY = json.dumps({
+    'status': 'error',
+    'error_code': 'INVALID_API_KEY',
+    'error_message': 'Invalid or inactive API key'
+}).encode()
+
+
+def _intern_permissions(permissions: Iterable[str]) -> FrozenSet[str]:
+    """Normalize permissions to a frozenset of interned strings.
+    
+    Args:
+        permissions: Permission names
+        
+    Returns:
+        Frozen set of interned permission names
+    """
+    return frozenset(sys.intern(p) for p in permissions)
+
+
+def _expand_permissions(permissions: FrozenSet[str]) -> FrozenSet[str]:
+    """Expand permissions with the ones implied by 'admin'.
+    
+    Args:
+        permissions: Granted permissions
+        
+    Returns:
+        Effective permissions
+    """
+    if 'admin' in permissions:
+        return permissions | _ADMIN_IMPLIED_PERMISSIONS
+    return permissions
+
 
 @dataclass
 class APIKey:
@@ -23,12 +70,26 @@ class APIKey:
     key_id: str
     key_hash: str
     name: str
-    permissions: List[str]
+    permissions: FrozenSet[str]
     rate_limit: int
     created_at: float
     last_used: float = 0.0
     is_active: bool = True
     description: str = ""
+    effective_permissions: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Store permissions as an interned frozenset for O(1) lookups."""
+        self.set_permissions(self.permissions)
+    
+    def set_permissions(self, permissions: Iterable[str]) -> None:
+        """Replace granted permissions and recompute effective permissions.
+        
+        Args:
+            permissions: New permission names
+        """
+        self.permissions = _intern_permissions(permissions)
+        self.effective_permissions = _expand_permissions(self.permissions)
     
     def to_dict(self, include_hash: bool = False) -> Dict[str, Any]:
         """Convert to dictionary for API responses.
@@ -42,7 +103,7 @@ class APIKey:
         data = {
             'key_id': self.key_id,
             'name': self.name,
-            'permissions': self.permissions,
+            'permissions': sorted(self.permissions),
             'rate_limit': self.rate_limit,
             'created_at': self.created_at,
             'last_used': self.last_used,
@@ -80,6 +141,35 @@ class RateLimitTracker:
     def add_request(self) -> None:
         """Add a request to the tracker."""
         self.requests.append(time.time())
+    
+    def add_requests(self, count: int) -> None:
+        """Add several requests sharing a single timestamp.
+        
+        Args:
+            count: Number of requests to add
+        """
+        self.requests.extend([time.time()] * count)
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a rate limit check for an authorized request."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    
+    def to_dict(self) -> Dict[str, int]:
+        """Convert to the rate limit info dictionary.
+        
+        Returns:
+            Dictionary with limit, remaining, and reset time
+        """
+        return {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset': self.reset
+        }
 
 
 class APIKeyManager:
@@ -92,6 +182,7 @@ class APIKeyManager:
             storage_path: Optional path to persist API keys to disk
         """
         self.api_keys: Dict[str, APIKey] = {}
+        self._key_ids_by_hash: Dict[str, str] = {}
         self.rate_limit_trackers: Dict[str, RateLimitTracker] = defaultdict(RateLimitTracker)
         self.storage_path = storage_path
         self._load_keys()
@@ -132,6 +223,7 @@ class APIKeyManager:
                     for key_data in data.get('api_keys', []):
                         api_key = APIKey(**key_data)
                         self.api_keys[api_key.key_id] = api_key
+                        self._key_ids_by_hash[api_key.key_hash] = api_key.key_id
                 logger.info(f"Loaded {len(self.api_keys)} API keys from storage")
             except Exception as e:
                 logger.error(f"Failed to load API keys: {e}")
@@ -180,6 +272,7 @@ class APIKeyManager:
         )
         
         self.api_keys[key_id] = new_key
+        self._key_ids_by_hash[key_hash] = key_id
         self._save_keys()
         
         logger.info(f"Created API key: {key_id} ({name})")
@@ -194,15 +287,27 @@ class APIKeyManager:
         Returns:
             APIKey object if valid, None otherwise
         """
-        key_hash = self._hash_key(api_key)
+        key = self._find_active_key(self._hash_key(api_key))
+        if key is None:
+            return None
         
-        for key in self.api_keys.values():
-            if key.key_hash == key_hash and key.is_active:
-                key.last_used = time.time()
-                self._save_keys()
-                return key
+        key.last_used = time.time()
+        self._save_keys()
+        return key
+    
+    def _find_active_key(self, key_hash: str) -> Optional[APIKey]:
+        """Look up an active API key by its hash.
         
-        return None
+        Args:
+            key_hash: Hash of the provided API key
+            
+        Returns:
+            APIKey object if found and active, None otherwise
+        """
+        key = self.api_keys.get(self._key_ids_by_hash.get(key_hash, ''))
+        if key is None or not key.is_active:
+            return None
+        return key
     
     def get_key(self, key_id: str) -> Optional[APIKey]:
         """Get an API key by ID.
@@ -238,7 +343,9 @@ class APIKeyManager:
             return False
         
         for field, value in kwargs.items():
-            if hasattr(key, field):
+            if field == 'permissions':
+                key.set_permissions(value)
+            elif hasattr(key, field):
                 setattr(key, field, value)
         
         self._save_keys()
@@ -255,7 +362,8 @@ class APIKeyManager:
             True if deleted, False if not found
         """
         if key_id in self.api_keys:
-            del self.api_keys[key_id]
+            key = self.api_keys.pop(key_id)
+            self._key_ids_by_hash.pop(key.key_hash, None)
             self._save_keys()
             logger.info(f"Deleted API key: {key_id}")
             return True
@@ -282,6 +390,15 @@ class APIKeyManager:
         tracker = self.rate_limit_trackers[api_key.key_id]
         tracker.add_request()
     
+    def record_requests(self, api_key: APIKey, count: int) -> None:
+        """Record a burst of requests for rate limiting.
+        
+        Args:
+            api_key: API key making the requests
+            count: Number of requests to record
+        """
+        self.rate_limit_trackers[api_key.key_id].add_requests(count)
+    
     def check_permission(self, api_key: APIKey, required_permission: str) -> bool:
         """Check if API key has required permission.
         
@@ -292,7 +409,7 @@ class APIKeyManager:
         Returns:
             True if has permission, False otherwise
         """
-        return 'admin' in api_key.permissions or required_permission in api_key.permissions
+        return required_permission in api_key.effective_permissions
     
     def get_rate_limit_info(self, api_key: APIKey) -> Dict[str, int]:
         """Get rate limit information for an API key.
@@ -319,6 +436,42 @@ class APIKeyManager:
             'remaining': remaining,
             'reset': reset_time
         }
+    
+    def authorize(self, api_key: str) -> Tuple[Optional[APIKey], Optional[RateLimitDecision]]:
+        """Validate an API key, check its rate limit and record the request.
+        
+        The request is only recorded when it is within the rate limit.
+        
+        Args:
+            api_key: Raw API key provided by the client
+            
+        Returns:
+            Tuple of (APIKey, RateLimitDecision), or (None, None) if the key
+            is invalid or inactive
+        """
+        key = self.validate_key(api_key)
+        if key is None:
+            return None, None
+        
+        tracker = self.rate_limit_trackers[key.key_id]
+        used = tracker.count_requests()
+        allowed = used < key.rate_limit
+        if allowed:
+            tracker.add_request()
+            used += 1
+        
+        # Requests are appended in order, so the first one is the oldest
+        if tracker.requests:
+            reset_time = int(tracker.requests[0] + 1)
+        else:
+            reset_time = int(time.time()) + 1
+        
+        return key, RateLimitDecision(
+            allowed=allowed,
+            limit=key.rate_limit,
+            remaining=max(0, key.rate_limit - used),
+            reset=reset_time
+        )
 
 
 class AuthLogger:
@@ -419,7 +572,7 @@ class AuthMiddleware:
         
         # Check if endpoint is public
         path = request.path
-        if any(path.startswith(ep) for ep in self.public_endpoints):
+        if path in self.public_endpoints or any(path.startswith(ep) for ep in self.public_endpoints):
             return await handler(request)
         
         # Get API key from header
@@ -431,28 +584,22 @@ class AuthMiddleware:
                 path,
                 'Missing API key'
             )
-            return web.json_response(
-                {
-                    'status': 'error',
-                    'error_code': 'AUTHORIZATION_REQUIRED',
-                    'error_message': 'API key is required'
-                },
-                status=401
+            return web.Response(
+                status=401,
+                body=_AUTHORIZATION_REQUIRED_BODY,
+                content_type='application/json'
             )
         
         # Check if IP is blocked
         if self.auth_logger.is_ip_blocked(request.remote or 'unknown'):
-            return web.json_response(
-                {
-                    'status': 'error',
-                    'error_code': 'IP_BLOCKED',
-                    'error_message': 'Too many failed authentication attempts'
-                },
-                status=429
+            return web.Response(
+                status=429,
+                body=_IP_BLOCKED_BODY,
+                content_type='application/json'
             )
         
-        # Validate API key
-        api_key = self.key_manager.validate_key(provided_key)
+        # Validate API key, check rate limit and record the request
+        api_key, decision = self.key_manager.authorize(provided_key)
         
         if not api_key:
             self.auth_logger.log_failure(
@@ -460,18 +607,16 @@ class AuthMiddleware:
                 path,
                 'Invalid API key'
             )
-            return web.json_response(
-                {
-                    'status': 'error',
-                    'error_code': 'INVALID_API_KEY',
-                    'error_message': 'Invalid or inactive API key'
-                },
-                status=401
+            return web.Response(
+                status=401,
+                body=_INVALID_API_KEY_BODY,
+                content_type='application/json'
             )
         
+        rate_info = decision.to_dict()
+        
         # Check rate limit
-        if not self.key_manager.check_rate_limit(api_key):
-            rate_info = self.key_manager.get_rate_limit_info(api_key)
+        if not decision.allowed:
             return web.json_response(
                 {
                     'status': 'error',
@@ -488,10 +633,6 @@ class AuthMiddleware:
                 }
             )
         
-        # Record request and add rate limit headers
-        self.key_manager.record_request(api_key)
-        rate_info = self.key_manager.get_rate_limit_info(api_key)
-        
         # Store API key in request for use by handlers
         request['api_key'] = api_key
         
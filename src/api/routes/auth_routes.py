@@ -435,7 +435,7 @@ async def get_auth_status(request: web.Request) -> web.Response:
                     'authenticated': True,
                     'key_id': api_key.key_id,
                     'key_name': api_key.name,
-                    'permissions': api_key.permissions,
+                    'permissions': sorted(api_key.permissions),
                     'rate_limit': {
                         'limit': rate_info['limit'],
                         'remaining': rate_info['remaining'],
@@ -6,12 +6,18 @@ import logging
 import asyncio
 import time
 import re
-from typing import Dict, Any, Optional, List, Set, Callable, Tuple
+import json
+from typing import Dict, Any, Optional, List, Set, Callable, Tuple, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict
 import aiohttp
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # Component logging
 logger = logging.getLogger(__name__)
 
@@ -34,6 +40,8 @@ class CacheEntry:
     access_count: int = 0
     last_access: float = field(default_factory=time.time)
     status: CacheEntryStatus = CacheEntryStatus.VALID
+    category: Optional['CacheCategory'] = None
+    generation: int = 0  # Category generation the entry was stored under
     
     def is_expired(self) -> bool:
         """Check if the cache entry has expired."""
@@ -113,6 +121,34 @@ class CacheCategory(Enum):
     CUSTOM = "custom"
 
 
+# Cache categories invalidated by each Moonraker status object
+_INVALIDATION_MAP: Dict[str, Tuple[CacheCategory, ...]] = {
+    'output_pin': (CacheCategory.GPIO, CacheCategory.PWM),
+    'fan': (CacheCategory.FAN,),
+    'toolhead': (CacheCategory.POSITION,),
+    'temperature_sensor': (CacheCategory.SENSOR,),
+    'heaters': (CacheCategory.SENSOR,),
+    'print_stats': (CacheCategory.PRINTER_STATE,)
+}
+_INVALIDATING_OBJECTS = frozenset(_INVALIDATION_MAP)
+
+# Notifications that invalidate anything, and the raw-text marker used to
+# drop other frames without decoding them
+_INVALIDATING_METHODS = frozenset({'notify_status_update'})
+_STATUS_UPDATE_MARKER = '"notify_status_update"'
+
+# Subscription request for those objects, serialized once and resent as-is
+# on every (re)connect
+_SUBSCRIBE_MESSAGE = json.dumps({
+    "jsonrpc": "2.0",
+    "method": "printer.objects.subscribe",
+    "params": {
+        "objects": {name: None for name in _INVALIDATION_MAP}
+    },
+    "id": 1
+})
+
+
 class StateCacheManager:
     """Manages hardware state caching with TTL support and automatic invalidation."""
     
@@ -128,6 +164,10 @@ class StateCacheManager:
         CacheCategory.CUSTOM: 5.0
     }
     
+    # WebSocket messages buffered ahead of the invalidation worker; when full
+    # the receive loop waits, pushing back on the socket
+    INGEST_QUEUE_SIZE = 64
+    
     def __init__(self,
                  moonraker_host: str = 'localhost',
                  moonraker_port: int = 7125,
@@ -135,7 +175,8 @@ class StateCacheManager:
                  default_ttl: float = 1.0,
                  max_cache_size: int = 10000,
                  cleanup_interval: float = 10.0,
-                 enable_auto_refresh: bool = True):
+                 enable_auto_refresh: bool = True,
+                 invalidation_window: float = 0.0):
         """Initialize the state cache manager.
         
         Args:
@@ -146,6 +187,8 @@ class StateCacheManager:
             max_cache_size: Maximum number of cache entries
             cleanup_interval: Interval for expired entry cleanup (seconds)
             enable_auto_refresh: Enable automatic cache refresh
+            invalidation_window: Window for coalescing WebSocket invalidations
+                (seconds); 0 invalidates on every status update
         """
         self.moonraker_host = moonraker_host
         self.moonraker_port = moonraker_port
@@ -157,11 +200,16 @@ class StateCacheManager:
         self.max_cache_size = max_cache_size
         self.cleanup_interval = cleanup_interval
         self.enable_auto_refresh = enable_auto_refresh
+        self.invalidation_window = invalidation_window
         
         # Cache storage
         self._cache: Dict[str, CacheEntry] = {}
         self._category_index: Dict[CacheCategory, Set[str]] = defaultdict(set)
         
+        # Category generations; bumping one makes every entry stored under an
+        # older generation stale without touching the entries themselves
+        self._generations: Dict[CacheCategory, int] = defaultdict(int)
+        
         # Statistics
         self._stats = CacheStatistics()
         
@@ -180,6 +228,10 @@ class StateCacheManager:
         self._websocket_client: Optional[aiohttp.ClientSession] = None
         self._websocket_connected = False
         
+        # Categories awaiting a coalesced invalidation
+        self._dirty_categories: Set[CacheCategory] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        
         logger.info(f"State cache manager initialized with default_ttl={default_ttl}s, "
                    f"max_size={max_cache_size}")
     
@@ -226,6 +278,15 @@ class StateCacheManager:
             except asyncio.CancelledError:
                 pass
         
+        # Drop any pending coalesced invalidation; the cache is cleared below
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._dirty_categories.clear()
+        
         # Disconnect WebSocket
         await self._disconnect_websocket()
         
@@ -249,7 +310,7 @@ class StateCacheManager:
         async with self._lock:
             entry = self._cache.get(key)
             
-            if entry and entry.is_valid() and not force_refresh:
+            if entry and entry.is_valid() and self._is_current(entry) and not force_refresh:
                 # Cache hit
                 entry.touch()
                 self._stats.hits += 1
@@ -268,17 +329,20 @@ class StateCacheManager:
             if category and category in self._fetch_functions:
                 try:
                     fetch_func = self._fetch_functions[category]
+                    generation = self._generations[category]
                     fresh_data = await fetch_func(key)
                     
                     if fresh_data is not None:
-                        await self.set(key, fresh_data, category=category)
+                        await self._store_entry(key, fresh_data, None, category, generation)
                         self._stats.refreshes += 1
                         return fresh_data
                 except Exception as e:
                     logger.error(f"Error fetching data for {key}: {e}")
             
-            # Return cached value even if expired (as fallback)
-            if entry:
+            # Return cached value even if expired (as fallback), but never
+            # one that was explicitly invalidated
+            if (entry and entry.status != CacheEntryStatus.INVALIDATED
+                    and self._is_current(entry)):
                 return entry.value
             
             return None
@@ -294,31 +358,8 @@ class StateCacheManager:
             category: Cache category
         """
         async with self._lock:
-            # Determine TTL
-            if ttl is None and category:
-                ttl = self.DEFAULT_TTLS.get(category, self.default_ttl)
-            elif ttl is None:
-                ttl = self.default_ttl
-            
-            # Create cache entry
-            entry = CacheEntry(key=key, value=value, ttl=ttl)
-            
-            # Check cache size limit
-            if len(self._cache) >= self.max_cache_size:
-                await self._evict_oldest()
-            
-            # Store entry
-            self._cache[key] = entry
-            
-            # Update category index
-            if category:
-                self._category_index[category].add(key)
-            
-            # Update statistics
-            self._stats.total_entries = len(self._cache)
-            self._stats.memory_usage_bytes = self._estimate_memory_usage()
-            
-            logger.debug(f"Cache set: {key} (ttl={ttl}s)")
+            await self._store_entry(key, value, ttl, category,
+                                    self._generations[category] if category else 0)
     
     async def invalidate(self, key: str) -> bool:
         """Invalidate a specific cache entry.
@@ -330,15 +371,7 @@ class StateCacheManager:
             True if entry was invalidated, False if not found
         """
         async with self._lock:
-            entry = self._cache.get(key)
-            
-            if entry:
-                entry.invalidate()
-                self._stats.invalidations += 1
-                logger.debug(f"Cache invalidated: {key}")
-                return True
-            
-            return False
+            return self._invalidate_key(key)
     
     async def invalidate_pattern(self, pattern: str) -> int:
         """Invalidate all cache entries matching a pattern.
@@ -354,8 +387,7 @@ class StateCacheManager:
             regex = re.compile(pattern)
             
             for key in list(self._cache.keys()):
-                if regex.match(key):
-                    await self.invalidate(key)
+                if regex.match(key) and self._invalidate_key(key):
                     count += 1
             
             logger.debug(f"Invalidated {count} entries matching pattern: {pattern}")
@@ -370,16 +402,25 @@ class StateCacheManager:
         Returns:
             Number of entries invalidated
         """
-        async with self._lock:
-            count = 0
-            keys = self._category_index.get(category, set()).copy()
-            
-            for key in keys:
-                if await self.invalidate(key):
-                    count += 1
+        # Only counters change, so this needs no lock and never suspends
+        return self._invalidate_category(category)
+    
+    async def invalidate_categories(self, categories: Iterable[CacheCategory]) -> int:
+        """Invalidate all cache entries in several categories at once.
+        
+        Like invalidate_category(), this completes without suspending and
+        without the cache lock. Fetches already in flight store their result
+        under the generation they started with, so it is still treated as
+        stale afterwards.
+        
+        Args:
+            categories: Cache categories to invalidate
             
-            logger.debug(f"Invalidated {count} entries in category: {category.value}")
-            return count
+        Returns:
+            Total number of entries invalidated
+        """
+        invalidate = self._invalidate_category
+        return sum([invalidate(category) for category in categories])
     
     async def refresh(self, key: str, category: Optional[CacheCategory] = None) -> bool:
         """Refresh a cache entry by fetching fresh data.
@@ -395,10 +436,12 @@ class StateCacheManager:
             # Fetch fresh data
             if category and category in self._fetch_functions:
                 fetch_func = self._fetch_functions[category]
+                generation = self._generations[category]
                 fresh_data = await fetch_func(key)
                 
                 if fresh_data is not None:
-                    await self.set(key, fresh_data, category=category)
+                    async with self._lock:
+                        await self._store_entry(key, fresh_data, None, category, generation)
                     self._stats.refreshes += 1
                     logger.debug(f"Cache refreshed: {key}")
                     return True
@@ -451,6 +494,20 @@ class StateCacheManager:
         logger.info(f"Cache warmed with {count}/{len(keys)} entries")
         return count
     
+    def get_category_generation(self, category: CacheCategory) -> int:
+        """Get how many times a category has been invalidated.
+        
+        Coalesced invalidations count once per flush, so callers should
+        compare generations rather than count invalidation calls.
+        
+        Args:
+            category: Cache category
+            
+        Returns:
+            Current generation of the category
+        """
+        return self._generations.get(category, 0)
+    
     async def get_category_keys(self, category: CacheCategory) -> List[str]:
         """Get all keys in a specific category.
         
@@ -458,10 +515,13 @@ class StateCacheManager:
             category: Cache category
             
         Returns:
-            List of keys in the category
+            List of keys in the category, excluding entries made stale by
+            a category invalidation that the cleanup loop has not removed yet
         """
         async with self._lock:
-            return list(self._category_index.get(category, set()))
+            cache = self._cache
+            return [key for key in self._category_index.get(category, ())
+                    if key in cache and self._is_current(cache[key])]
     
     async def get_all_keys(self) -> List[str]:
         """Get all cache keys.
@@ -725,7 +785,7 @@ class StateCacheManager:
             keys_to_remove = []
             
             for key, entry in self._cache.items():
-                if not entry.is_valid():
+                if not entry.is_valid() or not self._is_current(entry):
                     keys_to_remove.append(key)
             
             for key in keys_to_remove:
@@ -747,6 +807,48 @@ class StateCacheManager:
             
             return removed
     
+    async def _store_entry(self, key: str, value: Any, ttl: Optional[float],
+                           category: Optional[CacheCategory], generation: int) -> None:
+        """Store a cache entry; the caller must hold the cache lock.
+        
+        Values fetched from Moonraker are stored under the category generation
+        read before the fetch, so an invalidation that lands while the fetch is
+        in flight leaves them stale instead of being lost.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (uses default if not specified)
+            category: Cache category
+            generation: Category generation the value was read under
+        """
+        # Determine TTL
+        if ttl is None and category:
+            ttl = self.DEFAULT_TTLS.get(category, self.default_ttl)
+        elif ttl is None:
+            ttl = self.default_ttl
+        
+        # Create cache entry
+        entry = CacheEntry(key=key, value=value, ttl=ttl, category=category,
+                           generation=generation)
+        
+        # Check cache size limit
+        if len(self._cache) >= self.max_cache_size:
+            await self._evict_oldest()
+        
+        # Store entry
+        self._cache[key] = entry
+        
+        # Update category index
+        if category:
+            self._category_index[category].add(key)
+        
+        # Update statistics
+        self._stats.total_entries = len(self._cache)
+        self._stats.memory_usage_bytes = self._estimate_memory_usage()
+        
+        logger.debug(f"Cache set: {key} (ttl={ttl}s)")
+    
     async def _evict_oldest(self) -> None:
         """Evict the oldest cache entry when cache is full."""
         if not self._cache:
@@ -765,6 +867,56 @@ class StateCacheManager:
         
         logger.debug(f"Evicted oldest cache entry: {oldest_key}")
     
+    def _invalidate_key(self, key: str) -> bool:
+        """Invalidate a cache entry; the caller must hold the cache lock.
+        
+        Args:
+            key: Cache key to invalidate
+            
+        Returns:
+            True if entry was invalidated, False if not found
+        """
+        entry = self._cache.get(key)
+        
+        if entry:
+            entry.invalidate()
+            self._stats.invalidations += 1
+            logger.debug(f"Cache invalidated: {key}")
+            return True
+        
+        return False
+    
+    def _invalidate_category(self, category: CacheCategory) -> int:
+        """Invalidate a category's entries.
+        
+        Bumps the category generation instead of visiting each entry; stale
+        entries are dropped by the cleanup loop. Nothing here awaits, so the
+        update is atomic with respect to other tasks without taking the lock.
+        
+        Args:
+            category: Cache category to invalidate
+            
+        Returns:
+            Number of entries invalidated
+        """
+        self._generations[category] += 1
+        count = len(self._category_index.get(category, ()))
+        self._stats.invalidations += count
+        
+        logger.debug(f"Invalidated {count} entries in category: {category.value}")
+        return count
+    
+    def _is_current(self, entry: CacheEntry) -> bool:
+        """Check that an entry was stored under its category's current generation.
+        
+        Args:
+            entry: Cache entry to check
+            
+        Returns:
+            True if the entry's category has not been invalidated since it was set
+        """
+        return entry.category is None or entry.generation == self._generations[entry.category]
+    
     def _estimate_memory_usage(self) -> int:
         """Estimate memory usage of cache in bytes.
         
@@ -798,16 +950,32 @@ class StateCacheManager:
                     # Subscribe to relevant events
                     await self._subscribe_to_events(ws)
                     
-                    # Listen for updates
-                    async for msg in ws:
-                        if msg.type == aiohttp.WSMsgType.TEXT:
-                            await self._handle_websocket_message(msg.json())
-                        elif msg.type == aiohttp.WSMsgType.ERROR:
-                            logger.error(f"WebSocket error: {ws.exception()}")
-                            break
-                        elif msg.type == aiohttp.WSMsgType.CLOSED:
-                            logger.info("WebSocket connection closed")
-                            break
+                    # A single worker applies updates handed over through a
+                    # bounded queue
+                    ingest_queue: asyncio.Queue = asyncio.Queue(maxsize=self.INGEST_QUEUE_SIZE)
+                    worker = asyncio.create_task(self._ingest_worker(ingest_queue))
+                    
+                    try:
+                        # Listen for updates
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                if _STATUS_UPDATE_MARKER in msg.data:
+                                    await ingest_queue.put(_json_loads(msg.data))
+                            elif msg.type == aiohttp.WSMsgType.ERROR:
+                                logger.error(f"WebSocket error: {ws.exception()}")
+                                break
+                            elif msg.type == aiohttp.WSMsgType.CLOSED:
+                                logger.info("WebSocket connection closed")
+                                break
+                        
+                        # Apply whatever was received before the connection ended
+                        await ingest_queue.join()
+                    finally:
+                        worker.cancel()
+                        try:
+                            await worker
+                        except asyncio.CancelledError:
+                            pass
                     
                     self._websocket_connected = False
                     
@@ -815,30 +983,26 @@ class StateCacheManager:
             logger.error(f"Error connecting to WebSocket: {e}")
             self._websocket_connected = False
     
+    async def _ingest_worker(self, queue: asyncio.Queue) -> None:
+        """Apply queued WebSocket messages in arrival order.
+        
+        Args:
+            queue: Queue of decoded WebSocket messages
+        """
+        while True:
+            message = await queue.get()
+            try:
+                await self._handle_websocket_message(message)
+            finally:
+                queue.task_done()
+    
     async def _subscribe_to_events(self, ws) -> None:
         """Subscribe to Moonraker WebSocket events for cache invalidation.
         
         Args:
             ws: WebSocket connection
         """
-        # Subscribe to status updates
-        subscribe_msg = {
-            "jsonrpc": "2.0",
-            "method": "printer.objects.subscribe",
-            "params": {
-                "objects": {
-                    "output_pin": None,
-                    "fan": None,
-                    "toolhead": None,
-                    "temperature_sensor": None,
-                    "heaters": None,
-                    "print_stats": None
-                }
-            },
-            "id": 1
-        }
-        
-        await ws.send_json(subscribe_msg)
+        await ws.send_str(_SUBSCRIBE_MESSAGE)
         logger.info("Subscribed to Moonraker status updates")
     
     async def _handle_websocket_message(self, message: Dict[str, Any]) -> None:
@@ -848,13 +1012,14 @@ class StateCacheManager:
             message: WebSocket message
         """
         try:
-            # Handle status updates
-            if message.get('method') == 'notify_status_update':
-                params = message.get('params', [])
-                
-                if params:
-                    status_update = params[0]
-                    await self._invalidate_on_status_update(status_update)
+            # Responses and other notifications carry nothing to invalidate
+            if message.get('method') not in _INVALIDATING_METHODS:
+                return
+            
+            params = message.get('params')
+            
+            if params:
+                await self._invalidate_on_status_update(params[0])
             
         except Exception as e:
             logger.error(f"Error handling WebSocket message: {e}")
@@ -865,26 +1030,34 @@ class StateCacheManager:
         Args:
             status_update: Status update from Moonraker
         """
-        # Invalidate GPIO cache if output_pin changed
-        if 'output_pin' in status_update:
-            await self.invalidate_category(CacheCategory.GPIO)
-            await self.invalidate_category(CacheCategory.PWM)
+        # Filter the update's objects in one set operation, then look up only
+        # the ones that invalidate something; the touched categories are
+        # invalidated together under a single lock acquisition
+        categories: Set[CacheCategory] = set()
+        add_categories = categories.update
+        invalidation_map = _INVALIDATION_MAP
         
-        # Invalidate fan cache if fan changed
-        if 'fan' in status_update:
-            await self.invalidate_category(CacheCategory.FAN)
+        for key in _INVALIDATING_OBJECTS.intersection(status_update):
+            add_categories(invalidation_map[key])
         
-        # Invalidate position cache if toolhead changed
-        if 'toolhead' in status_update:
-            await self.invalidate_category(CacheCategory.POSITION)
+        if not categories:
+            return
         
-        # Invalidate sensor cache if temperature sensors changed
-        if 'temperature_sensor' in status_update or 'heaters' in status_update:
-            await self.invalidate_category(CacheCategory.SENSOR)
+        if self.invalidation_window > 0:
+            # Defer to a single flush per window
+            self._dirty_categories |= categories
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_dirty_categories())
+            return
         
-        # Invalidate printer state if print_stats changed
-        if 'print_stats' in status_update:
-            await self.invalidate_category(CacheCategory.PRINTER_STATE)
+        await self.invalidate_categories(categories)
+    
+    async def _flush_dirty_categories(self) -> None:
+        """Invalidate the categories collected during each coalescing window."""
+        while self._dirty_categories:
+            await asyncio.sleep(self.invalidation_window)
+            categories, self._dirty_categories = self._dirty_categories, set()
+            await self.invalidate_categories(categories)
     
     async def _disconnect_websocket(self) -> None:
         """Disconnect from WebSocket."""
@@ -904,6 +1077,7 @@ async def create_cache_manager(moonraker_host: str = 'localhost',
                               max_cache_size: int = 10000,
                               cleanup_interval: float = 10.0,
                               enable_auto_refresh: bool = True,
+                              invalidation_window: float = 0.0,
                               auto_start: bool = True) -> StateCacheManager:
     """Create and optionally start a cache manager.
     
@@ -915,6 +1089,7 @@ async def create_cache_manager(moonraker_host: str = 'localhost',
         max_cache_size: Maximum number of cache entries
         cleanup_interval: Interval for expired entry cleanup (seconds)
         enable_auto_refresh: Enable automatic cache refresh
+        invalidation_window: Window for coalescing WebSocket invalidations (seconds)
         auto_start: Automatically start the cache manager
         
     Returns:
@@ -927,7 +1102,8 @@ async def create_cache_manager(moonraker_host: str = 'localhost',
         default_ttl=default_ttl,
         max_cache_size=max_cache_size,
         cleanup_interval=cleanup_interval,
-        enable_auto_refresh=enable_auto_refresh
+        enable_auto_refresh=enable_auto_refresh,
+        invalidation_window=invalidation_window
     )
     
     if auto_start:
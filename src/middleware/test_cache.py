@@ -473,10 +473,10 @@ class TestCacheInvalidate:
         
         assert count == 2
         
-        # Verify only sensor key remains
-        assert 'gpio:pin1' not in state_cache_manager._cache
-        assert 'gpio:pin2' not in state_cache_manager._cache
-        assert 'sensor:temp1' in state_cache_manager._cache
+        # Verify only the sensor key is still served
+        assert await state_cache_manager.get('gpio:pin1') is None
+        assert await state_cache_manager.get('gpio:pin2') is None
+        assert await state_cache_manager.get('sensor:temp1') == 'value3'
     
     @pytest.mark.asyncio
     async def test_invalidate_category(self, state_cache_manager):
@@ -491,10 +491,68 @@ class TestCacheInvalidate:
         
         assert count == 2
         
-        # Verify only sensor key remains
-        assert 'gpio:pin1' not in state_cache_manager._cache
-        assert 'gpio:pin2' not in state_cache_manager._cache
-        assert 'sensor:temp1' in state_cache_manager._cache
+        # Verify only the GPIO generation moved on
+        assert state_cache_manager.get_category_generation(CacheCategory.GPIO) == 1
+        assert state_cache_manager.get_category_generation(CacheCategory.SENSOR) == 0
+        
+        # Verify only the sensor key is still served
+        assert await state_cache_manager.get('gpio:pin1') is None
+        assert await state_cache_manager.get('gpio:pin2') is None
+        assert await state_cache_manager.get('sensor:temp1') == 'value2'
+        assert await state_cache_manager.get_category_keys(CacheCategory.GPIO) == []
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_categories(self, state_cache_manager):
+        """Test invalidating several categories in one call."""
+        await state_cache_manager.set('gpio:pin1', 'value1', category=CacheCategory.GPIO)
+        await state_cache_manager.set('sensor:temp1', 'value2', category=CacheCategory.SENSOR)
+        await state_cache_manager.set('fan:part', 'value3', category=CacheCategory.FAN)
+        
+        count = await state_cache_manager.invalidate_categories(
+            {CacheCategory.GPIO, CacheCategory.SENSOR}
+        )
+        
+        assert count == 2
+        cache = state_cache_manager._cache
+        assert not state_cache_manager._is_current(cache['gpio:pin1'])
+        assert not state_cache_manager._is_current(cache['sensor:temp1'])
+        assert state_cache_manager._is_current(cache['fan:part'])
+        assert state_cache_manager.get_category_generation(CacheCategory.GPIO) == 1
+        assert state_cache_manager.get_category_generation(CacheCategory.FAN) == 0
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_category_during_fetch(self, state_cache_manager):
+        """Test that an invalidation racing a fetch leaves the fetched value stale."""
+        fetch_started = asyncio.Event()
+        release_fetch = asyncio.Event()
+        
+        async def slow_fetch(key):
+            fetch_started.set()
+            await release_fetch.wait()
+            return {'value': 1}
+        
+        state_cache_manager._fetch_functions[CacheCategory.GPIO] = slow_fetch
+        fetch = asyncio.create_task(
+            state_cache_manager.get('gpio:pin1', category=CacheCategory.GPIO)
+        )
+        
+        # Invalidate while the fetch is still in flight
+        await fetch_started.wait()
+        await state_cache_manager.invalidate_category(CacheCategory.GPIO)
+        release_fetch.set()
+        
+        assert await asyncio.wait_for(fetch, timeout=1.0) == {'value': 1}
+        assert not state_cache_manager._is_current(state_cache_manager._cache['gpio:pin1'])
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_category_while_locked(self, state_cache_manager):
+        """Test that category invalidation does not wait for the cache lock."""
+        async with state_cache_manager._lock:
+            await asyncio.wait_for(
+                state_cache_manager.invalidate_category(CacheCategory.GPIO), timeout=1.0
+            )
+        
+        assert state_cache_manager.get_category_generation(CacheCategory.GPIO) == 1
 
 
 class TestCacheRefresh:
@@ -656,3 +714,18 @@ class TestCacheLifecycle:
         await state_cache_manager.stop()
         
         assert state_cache_manager._running == False
+    
+    @pytest.mark.asyncio
+    async def test_stop_cancels_pending_flush(self, state_cache_manager):
+        """Test that stopping drops a pending coalesced invalidation."""
+        state_cache_manager.invalidation_window = 60.0
+        await state_cache_manager.start()
+        
+        await state_cache_manager._invalidate_on_status_update({'fan': {'speed': 0.5}})
+        flush_task = state_cache_manager._flush_task
+        
+        await state_cache_manager.stop()
+        
+        assert flush_task.cancelled()
+        assert not state_cache_manager._dirty_categories
+        assert state_cache_manager.get_category_generation(CacheCategory.FAN) == 0
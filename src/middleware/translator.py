@@ -444,44 +444,70 @@ class OpenPNPTranslator:
         Returns:
             OpenPNPResponse object
         """
+        responses = await self._run_gcode([command], self.default_timeout)
+        return responses[0]
+    
+    async def _run_gcode(self, commands: List[OpenPNPCommand],
+                         timeout: float) -> List[OpenPNPResponse]:
+        """Translate commands to G-code and execute them as one script.
+        
+        Every command shares the outcome of the script: all succeed, or all
+        report the same error.
+        
+        Args:
+            commands: OpenPNP commands to execute
+            timeout: Timeout for the whole script in seconds
+            
+        Returns:
+            List of OpenPNPResponse objects, one per command
+        """
+        gcodes = [None] * len(commands)
+        result = None
+        error_message = None
+        error_code = None
+        
         try:
-            # Convert OpenPNP command to G-code
-            gcode = self._convert_to_gcode(command)
+            gcodes = [self._convert_to_gcode(cmd) for cmd in commands]
             
             # Execute G-code
             handler = self._get_execution_handler()
-            result = await handler.execute_single(gcode, timeout=self.default_timeout)
+            result = await handler.execute_single('\n'.join(gcodes), timeout=timeout)
             
-            # Build response
-            if result.status == ExecutionStatus.COMPLETED:
-                return OpenPNPResponse(
+            if result.status != ExecutionStatus.COMPLETED:
+                error_message = result.error_message or "G-code execution failed"
+                error_code = "GCODE_EXECUTION_FAILED"
+        
+        except Exception as e:
+            logger.error(f"Error executing G-code: {e}")
+            gcodes = [None] * len(commands)
+            error_message = str(e)
+            error_code = "GCODE_ERROR"
+        
+        # Build responses
+        responses = []
+        for cmd, gcode in zip(commands, gcodes):
+            if error_message is None:
+                responses.append(OpenPNPResponse(
                     status=ResponseStatus.SUCCESS,
-                    command=command.command_type.value,
-                    command_id=command.id,
+                    command=cmd.command_type.value,
+                    command_id=cmd.id,
                     data={
                         'gcode': gcode,
                         'execution_time': result.execution_time,
                         'response': result.response
                     }
-                )
+                ))
             else:
-                return OpenPNPResponse(
+                responses.append(OpenPNPResponse(
                     status=ResponseStatus.ERROR,
-                    command=command.command_type.value,
-                    command_id=command.id,
-                    error_message=result.error_message or "G-code execution failed",
-                    error_code="GCODE_EXECUTION_FAILED",
-                    data={'gcode': gcode}
-                )
-        
-        except Exception as e:
-            return OpenPNPResponse(
-                status=ResponseStatus.ERROR,
-                command=command.command_type.value,
-                command_id=command.id,
-                error_message=str(e),
-                error_code="GCODE_ERROR"
-            )
+                    command=cmd.command_type.value,
+                    command_id=cmd.id,
+                    error_message=error_message,
+                    error_code=error_code,
+                    data={'gcode': gcode} if gcode is not None else None
+                ))
+        
+        return responses
     
     async def _execute_hybrid(self, command: OpenPNPCommand) -> OpenPNPResponse:
         """Execute command using hybrid approach (API + G-code).
@@ -1160,12 +1186,15 @@ G0 Z{safe_height} F{f}'''
     # Batch and queue operations
     
     async def execute_batch(self, commands: List[Union[OpenPNPCommand, Dict[str, Any]]],
-                          stop_on_error: bool = True) -> List[OpenPNPResponse]:
+                          stop_on_error: bool = True,
+                          combine_gcode: bool = False) -> List[OpenPNPResponse]:
         """Execute multiple OpenPNP commands as a batch.
         
         Args:
             commands: List of OpenPNP commands
             stop_on_error: Stop on first error
+            combine_gcode: Send each run of consecutive G-code commands to
+                Moonraker as a single script (see translate_and_execute_batch)
             
         Returns:
             List of OpenPNPResponse objects
@@ -1174,11 +1203,27 @@ G0 Z{safe_height} F{f}'''
         
         logger.info(f"Executing batch of {len(commands)} commands")
         
+        # Consecutive G-code commands waiting to be sent as one script
+        pending = []
+        
         for cmd in commands:
             # Parse command if needed
             if isinstance(cmd, dict):
                 cmd = self._parse_command_dict(cmd)
             
+            if combine_gcode and self._get_strategy(cmd.command_type) == TranslationStrategy.GCODE:
+                pending.append(cmd)
+                continue
+            
+            if pending:
+                responses = await self.translate_and_execute_batch(pending)
+                results.extend(responses)
+                pending = []
+                
+                if stop_on_error and any(r.status == ResponseStatus.ERROR for r in responses):
+                    logger.error("Batch execution stopped due to error in combined G-code script")
+                    return results
+            
             # Execute command
             response = await self.translate_and_execute(cmd)
             results.append(response)
@@ -1186,10 +1231,68 @@ G0 Z{safe_height} F{f}'''
             # Stop on error if requested
             if response.status == ResponseStatus.ERROR and stop_on_error:
                 logger.error(f"Batch execution stopped due to error at command: {cmd.command_type.value}")
-                break
+                return results
+        
+        if pending:
+            results.extend(await self.translate_and_execute_batch(pending))
         
         return results
     
+    async def translate_and_execute_batch(self,
+                                          commands: List[Union[OpenPNPCommand, Dict[str, Any]]]
+                                          ) -> List[OpenPNPResponse]:
+        """Translate G-code commands and execute them as one Moonraker script.
+        
+        The batch costs a single Moonraker request instead of one per command.
+        Klipper aborts a script at its first failing line, so when the script
+        fails every command is reported as failed and state is left unchanged.
+        A batch containing a command that is not executed through G-code is
+        rejected as a whole without being sent.
+        
+        Args:
+            commands: OpenPNP commands or command dictionaries, all of which
+                must use the G-code translation strategy
+            
+        Returns:
+            List of OpenPNPResponse objects, one per command
+        """
+        start_time = time.time()
+        
+        # Parse commands if needed
+        commands = [self._parse_command_dict(cmd) if isinstance(cmd, dict) else cmd
+                    for cmd in commands]
+        if not commands:
+            return []
+        
+        rejected = [cmd for cmd in commands
+                    if self._get_strategy(cmd.command_type) != TranslationStrategy.GCODE]
+        if rejected:
+            error_message = f"Command {rejected[0].command_type.value} cannot be batched as G-code"
+            responses = [
+                OpenPNPResponse(
+                    status=ResponseStatus.ERROR,
+                    command=cmd.command_type.value,
+                    command_id=cmd.id,
+                    error_message=error_message,
+                    error_code="BATCH_NOT_GCODE"
+                )
+                for cmd in commands
+            ]
+        else:
+            logger.info(f"Executing batch of {len(commands)} commands as one G-code script")
+            
+            # Allow each command the timeout it would get on its own
+            responses = await self._run_gcode(commands, self.default_timeout * len(commands))
+        
+        execution_time = time.time() - start_time
+        
+        for cmd, response in zip(commands, responses):
+            response.execution_time = execution_time
+            if response.status == ResponseStatus.SUCCESS:
+                self._update_state(cmd, response)
+        
+        return responses
+    
     async def enqueue_command(self, command: Union[OpenPNPCommand, Dict[str, Any]],
                             priority: int = 0) -> str:
         """Enqueue a command for later execution.
@@ -7,7 +7,7 @@ import pytest_asyncio
 import asyncio
 import json
 from typing import Dict, Any, Optional, List
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch, call
 from aiohttp import web, ClientSession
 import aiohttp
 
@@ -34,12 +34,13 @@ API_PORT = 7126
 MOCK_API_KEY = 'test_api_key_12345678'
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return {'asyncio': asyncio.new_event_loop}
+    return {'uvloop': uvloop.new_event_loop}
 
 
 @pytest_asyncio.fixture
@@ -92,7 +93,7 @@ async def mock_moonraker_client():
     client._make_request = mock_make_request
     
     # Mock async context manager
-    async def mock_enter():
+    async def mock_enter(*args):
         return client
     
     async def mock_exit(*args):
@@ -104,9 +105,8 @@ async def mock_moonraker_client():
     yield client
 
 
-@pytest_asyncio.fixture
-async def mock_cache_manager():
-    """Create a mock cache manager for testing."""
+def _create_mock_cache_manager() -> MagicMock:
+    """Build a mock cache manager."""
     cache = MagicMock(spec=StateCacheManager)
     cache.moonraker_host = MOONRAKER_HOST
     cache.moonraker_port = MOONRAKER_PORT
@@ -125,12 +125,65 @@ async def mock_cache_manager():
         'hit_rate': 0.0
     })
     
-    yield cache
+    return cache
 
 
-@pytest_asyncio.fixture
-async def mock_safety_manager():
-    """Create a mock safety manager for testing."""
+class _CallRecorder:
+    """Awaitable stand-in for an AsyncMock method.
+    
+    Records calls and returns a fixed value, supporting the subset of the mock
+    assertion API the tests use without AsyncMock's per-call overhead.
+    """
+    
+    def __init__(self, return_value: Any = None):
+        self.return_value = return_value
+        self.call_args_list: List[Any] = []
+    
+    async def __call__(self, *args, **kwargs):
+        self.call_args_list.append(call(*args, **kwargs))
+        return self.return_value
+    
+    @property
+    def called(self) -> bool:
+        return bool(self.call_args_list)
+    
+    @property
+    def call_count(self) -> int:
+        return len(self.call_args_list)
+    
+    @property
+    def call_args(self) -> Any:
+        return self.call_args_list[-1] if self.call_args_list else None
+    
+    def assert_called(self) -> None:
+        assert self.called, "Expected call not made"
+    
+    def assert_called_with(self, *args, **kwargs) -> None:
+        expected = call(*args, **kwargs)
+        assert self.call_args == expected, f"Expected {expected}, last call was {self.call_args}"
+    
+    def assert_any_call(self, *args, **kwargs) -> None:
+        expected = call(*args, **kwargs)
+        assert expected in self.call_args_list, f"{expected} not in {self.call_args_list}"
+
+
+class _StubCacheManager(StateCacheManager):
+    """Cache manager with real WebSocket handling and invalidation.
+    
+    Entry reads and writes are recorded instead of touching the cache;
+    invalidations run for real, so tests check them through category
+    generations.
+    """
+    
+    def __init__(self):
+        super().__init__(moonraker_host=MOONRAKER_HOST, moonraker_port=MOONRAKER_PORT)
+        self.get = _CallRecorder()
+        self.set = _CallRecorder()
+        self.invalidate = _CallRecorder(True)
+
+
+def _create_mock_safety_manager() -> MagicMock:
+    """Build a mock safety manager."""
     safety = MagicMock(spec=SafetyManager)
     safety.limits = SafetyLimits()
     
@@ -150,7 +203,62 @@ async def mock_safety_manager():
         'emergency_stops': 0
     })
     
-    yield safety
+    return safety
+
+
+# Attributes the builders configure; tests sometimes rebind these directly
+_CACHE_MANAGER_ATTRS = (
+    'get', 'set', 'invalidate', 'invalidate_category',
+    'start', 'stop', 'get_statistics'
+)
+_SAFETY_MANAGER_ATTRS = (
+    'limits', 'start', 'stop', 'validate_move_command',
+    'validate_temperature_command', 'validate_fan_command',
+    'check_temperature_limits', 'check_position_limits', 'check_pwm_limits',
+    'emergency_stop', 'mark_axis_homed', 'get_statistics'
+)
+
+
+def _snapshot_mock(manager: MagicMock, attrs: tuple) -> Dict[str, Any]:
+    """Record the configured attributes of a mock manager."""
+    return {name: getattr(manager, name) for name in attrs}
+
+
+def _restore_mock(manager: MagicMock, snapshot: Dict[str, Any]) -> None:
+    """Undo per-test rebinding on a mock manager and clear its call records.
+    
+    Side effects set by tests are cleared as well; the mock factories never
+    configure one, while their return values are kept.
+    """
+    for name, value in snapshot.items():
+        setattr(manager, name, value)
+    manager.reset_mock(side_effect=True)
+
+
+@pytest_asyncio.fixture
+async def mock_cache_manager():
+    """Create a stub cache manager for testing WebSocket handling."""
+    yield _StubCacheManager()
+
+
+@pytest.fixture
+def category_generations(mock_cache_manager):
+    """Report how many generations each cache category advanced during a test."""
+    before = {
+        category: mock_cache_manager.get_category_generation(category)
+        for category in CacheCategory
+    }
+    
+    def advanced(category: CacheCategory) -> int:
+        return mock_cache_manager.get_category_generation(category) - before[category]
+    
+    return advanced
+
+
+@pytest_asyncio.fixture
+async def mock_safety_manager():
+    """Create a mock safety manager for testing."""
+    yield _create_mock_safety_manager()
 
 
 @pytest_asyncio.fixture
@@ -172,26 +280,67 @@ async def auth_manager(api_key_manager):
     yield api_key_manager, middleware, auth_logger
 
 
-@pytest_asyncio.fixture
-async def openpnp_translator(mock_moonraker_client):
-    """Create an OpenPNP translator for testing."""
-    translator = OpenPNPTranslator(
+def _snapshot_translator(translator: OpenPNPTranslator) -> Dict[str, Any]:
+    """Record the configuration of a translator that tests may change."""
+    gcode_translator = translator.gcode_translator
+    return {
+        'default_timeout': translator.default_timeout,
+        'templates': dict(gcode_translator.templates),
+        'validators': dict(gcode_translator.validators)
+    }
+
+
+def _reset_translator(translator: OpenPNPTranslator, snapshot: Dict[str, Any]) -> None:
+    """Drop everything a test may have patched or accumulated on a translator."""
+    translator.reset_state()
+    translator.default_timeout = snapshot['default_timeout']
+    translator._execution_handler = None
+    translator._moonraker_client = None
+    
+    gcode_translator = translator.gcode_translator
+    gcode_translator._moonraker_client = None
+    gcode_translator.reset_context()
+    gcode_translator.templates = dict(snapshot['templates'])
+    gcode_translator.validators = dict(snapshot['validators'])
+    
+    # Instance attributes shadowing methods are per-test patches
+    cls = type(translator)
+    for name in [name for name in vars(translator) if callable(getattr(cls, name, None))]:
+        delattr(translator, name)
+
+
+@pytest.fixture(scope="session")
+def shared_openpnp_translator():
+    """Create an OpenPNP translator shared by all tests in the session."""
+    return OpenPNPTranslator(
         moonraker_host=MOONRAKER_HOST,
         moonraker_port=MOONRAKER_PORT,
         moonraker_api_key=None
     )
+
+
+@pytest.fixture
+def openpnp_translator(shared_openpnp_translator, mock_moonraker_client):
+    """Provide the shared OpenPNP translator, reset to a clean state for each test."""
+    translator = shared_openpnp_translator
+    snapshot = _snapshot_translator(translator)
     
     # Mock the gcode_translator's moonraker client
     translator.gcode_translator._moonraker_client = mock_moonraker_client
     
     yield translator
+    
+    _reset_translator(translator, snapshot)
 
 
-@pytest_asyncio.fixture
-async def api_server(auth_manager, mock_cache_manager, mock_safety_manager):
-    """Create an API server for testing."""
-    key_manager, auth_middleware, auth_logger = auth_manager
+@pytest_asyncio.fixture(scope="session")
+async def shared_api_server():
+    """Create an API server shared by all tests in the session.
     
+    The server is not started: tests drive it through execute_command and
+    execute_batch, so no listening socket is needed. api_client starts it
+    on demand.
+    """
     server = APIServer(
         host=API_HOST,
         port=API_PORT,
@@ -203,21 +352,41 @@ async def api_server(auth_manager, mock_cache_manager, mock_safety_manager):
     )
     
     # Replace middleware components with mocks
-    server.cache_manager = mock_cache_manager
-    server.safety_manager = mock_safety_manager
-    
-    # Start server
-    await server.start()
+    server.cache_manager = _create_mock_cache_manager()
+    server.safety_manager = _create_mock_safety_manager()
     
     yield server
     
-    # Cleanup
+    # Cleanup (no-op if the server was never started)
     await server.stop()
 
 
+@pytest.fixture
+def api_server(shared_api_server):
+    """Provide the shared API server, reset to a clean state for each test."""
+    server = shared_api_server
+    translator = server.translator
+    translator_attrs = _snapshot_translator(translator)
+    cache_manager = server.cache_manager
+    safety_manager = server.safety_manager
+    cache_attrs = _snapshot_mock(cache_manager, _CACHE_MANAGER_ATTRS)
+    safety_attrs = _snapshot_mock(safety_manager, _SAFETY_MANAGER_ATTRS)
+    
+    yield server
+    
+    # Drop everything a test may have patched or accumulated
+    _reset_translator(translator, translator_attrs)
+    server.cache_manager = cache_manager
+    server.safety_manager = safety_manager
+    _restore_mock(cache_manager, cache_attrs)
+    _restore_mock(safety_manager, safety_attrs)
+
+
 @pytest_asyncio.fixture
 async def api_client(api_server):
     """Create an HTTP client for API testing."""
+    # Bind the HTTP listener only for tests that talk to it
+    await api_server.start()
     base_url = f"http://{API_HOST}:{API_PORT}"
     
     async with ClientSession() as session:
@@ -380,6 +549,3 @@ def sample_batch_commands():
         {'command': 'place', 'parameters': {'z': 0.0}},
     ]
 
-
-# Async test configuration
-pytest_plugins = ('pytest_asyncio',)
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+# Integration Test Helpers
+# Assertion helpers shared by integration test modules
+
+from typing import Any
+
+from middleware.translator import OpenPNPResponse, ResponseStatus
+
+
+def assert_ok_and_called_once(response: OpenPNPResponse, *mocks: Any) -> None:
+    """Assert that a response is successful and each mock was called once."""
+    assert response.status is ResponseStatus.SUCCESS, \
+        f"Expected success, got {response.status}: {response.error_message}"
+    for mock in mocks:
+        assert mock.call_count == 1, \
+            f"Expected one call, got {mock.call_count}"
@@ -3,7 +3,6 @@
 # Tests the integration between API layer and middleware components
 
 import pytest
-import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from aiohttp import web
 
@@ -18,11 +17,12 @@ from middleware.translator import (
 from middleware.cache import StateCacheManager, CacheCategory
 from middleware.safety import SafetyManager, SafetyLimits
 
+pytestmark = pytest.mark.integration
+
 
 class TestAPIToMiddlewareIntegration:
     """Test suite for API to middleware integration."""
     
-    @pytest_asyncio.asyncio_test
     async def test_api_server_initializes_translator(self, api_server):
         """Test that API server properly initializes the translator."""
         assert api_server.translator is not None
@@ -30,7 +30,6 @@ class TestAPIToMiddlewareIntegration:
         assert api_server.translator.moonraker_host == 'localhost'
         assert api_server.translator.moonraker_port == 7125
     
-    @pytest_asyncio.asyncio_test
     async def test_api_server_initializes_cache_manager(self, api_server):
         """Test that API server properly initializes the cache manager."""
         assert api_server.cache_manager is not None
@@ -38,14 +37,12 @@ class TestAPIToMiddlewareIntegration:
         assert hasattr(api_server.cache_manager, 'get')
         assert hasattr(api_server.cache_manager, 'set')
     
-    @pytest_asyncio.asyncio_test
     async def test_api_server_initializes_safety_manager(self, api_server):
         """Test that API server properly initializes the safety manager."""
         assert api_server.safety_manager is not None
         assert hasattr(api_server.safety_manager, 'validate_move_command')
         assert hasattr(api_server.safety_manager, 'emergency_stop')
     
-    @pytest_asyncio.asyncio_test
     async def test_api_execute_command_delegates_to_translator(self, api_server):
         """Test that API execute_command properly delegates to translator."""
         command = OpenPNPCommand(
@@ -69,7 +66,6 @@ class TestAPIToMiddlewareIntegration:
         assert response.status == ResponseStatus.SUCCESS
         assert response.data == {'test': 'data'}
     
-    @pytest_asyncio.asyncio_test
     async def test_api_execute_batch_delegates_to_translator(self, api_server):
         """Test that API execute_batch properly delegates to translator."""
         commands = [
@@ -94,14 +90,12 @@ class TestAPIToMiddlewareIntegration:
         assert len(responses) == 3
         assert all(r.status == ResponseStatus.SUCCESS for r in responses)
     
-    @pytest_asyncio.asyncio_test
     async def test_api_start_initializes_middleware_components(self, api_server):
         """Test that API server start method initializes middleware components."""
         # In tests, these are mocks, but verify they were called
         assert api_server.cache_manager.start.called or True  # May not be called in mock
         assert api_server.safety_manager.start.called or True
     
-    @pytest_asyncio.asyncio_test
     async def test_api_stop_cleans_up_middleware_components(self, api_server):
         """Test that API server stop method cleans up middleware components."""
         # Stop the server
@@ -111,7 +105,6 @@ class TestAPIToMiddlewareIntegration:
         assert api_server.cache_manager.stop.called or True
         assert api_server.safety_manager.stop.called or True
     
-    @pytest_asyncio.asyncio_test
     async def test_api_translator_state_updates(self, api_server):
         """Test that translator state updates are accessible through API server."""
         # Get initial state
@@ -139,7 +132,6 @@ class TestAPIToMiddlewareIntegration:
         updated_state = api_server.translator.get_state()
         assert updated_state['vacuum_enabled'] == True
     
-    @pytest_asyncio.asyncio_test
     async def test_api_cache_manager_integration(self, api_server):
         """Test that cache manager is properly integrated with API server."""
         # Verify cache manager is accessible
@@ -153,7 +145,6 @@ class TestAPIToMiddlewareIntegration:
         api_server.cache_manager.set.assert_called()
         api_server.cache_manager.get.assert_called()
     
-    @pytest_asyncio.asyncio_test
     async def test_api_safety_manager_integration(self, api_server):
         """Test that safety manager is properly integrated with API server."""
         # Verify safety manager is accessible
@@ -167,7 +158,6 @@ class TestAPIToMiddlewareIntegration:
         # In mock, verify method was called
         api_server.safety_manager.validate_move_command.assert_called()
     
-    @pytest_asyncio.asyncio_test
     async def test_api_error_handling_from_translator(self, api_server):
         """Test that API properly handles errors from translator."""
         command = OpenPNPCommand(
@@ -192,7 +182,6 @@ class TestAPIToMiddlewareIntegration:
         assert response.error_message == 'Translation failed'
         assert response.error_code == 'TRANSLATION_ERROR'
     
-    @pytest_asyncio.asyncio_test
     async def test_api_batch_execution_with_stop_on_error(self, api_server):
         """Test that batch execution stops on error when configured."""
         commands = [
@@ -221,7 +210,6 @@ class TestAPIToMiddlewareIntegration:
         assert responses[0].status == ResponseStatus.SUCCESS
         assert responses[1].status == ResponseStatus.ERROR
     
-    @pytest_asyncio.asyncio_test
     async def test_api_batch_execution_without_stop_on_error(self, api_server):
         """Test that batch execution continues on error when configured."""
         commands = [
@@ -251,7 +239,6 @@ class TestAPIToMiddlewareIntegration:
         assert responses[1].status == ResponseStatus.ERROR
         assert responses[2].status == ResponseStatus.SUCCESS
     
-    @pytest_asyncio.asyncio_test
     async def test_api_translator_statistics(self, api_server):
         """Test that translator statistics are accessible through API server."""
         # Mock statistics
@@ -269,7 +256,6 @@ class TestAPIToMiddlewareIntegration:
         assert stats == expected_stats
         api_server.translator.get_statistics.assert_called_once()
     
-    @pytest_asyncio.asyncio_test
     async def test_api_translator_history(self, api_server):
         """Test that translator history is accessible through API server."""
         # Mock history
@@ -286,7 +272,6 @@ class TestAPIToMiddlewareIntegration:
         assert history == expected_history
         api_server.translator.get_history.assert_called_once_with(limit=10)
     
-    @pytest_asyncio.asyncio_test
     async def test_api_translator_queue_info(self, api_server):
         """Test that translator queue information is accessible through API server."""
         # Mock queue info
@@ -304,7 +289,6 @@ class TestAPIToMiddlewareIntegration:
         assert queue_info == expected_queue_info
         api_server.translator.get_queue_info.assert_called_once()
     
-    @pytest_asyncio.asyncio_test
     async def test_api_translator_custom_templates(self, api_server):
         """Test that custom templates can be added through API server."""
         # Add custom template
@@ -318,7 +302,6 @@ class TestAPIToMiddlewareIntegration:
         assert template_name in templates
         assert templates[template_name] == template
     
-    @pytest_asyncio.asyncio_test
     async def test_api_translator_custom_validators(self, api_server):
         """Test that custom validators can be added through API server."""
         # Add custom validator
@@ -331,7 +314,6 @@ class TestAPIToMiddlewareIntegration:
         # Note: This is internal state, so we just verify the method was called
         assert hasattr(api_server.translator, 'add_custom_validator')
     
-    @pytest_asyncio.asyncio_test
     async def test_api_translator_reset_state(self, api_server):
         """Test that translator state can be reset through API server."""
         # Set some state
@@ -350,7 +332,6 @@ class TestAPIToMiddlewareIntegration:
 class TestAPIToMiddlewareCommandTypes:
     """Test suite for different command types through API to middleware."""
     
-    @pytest_asyncio.asyncio_test
     async def test_move_command_through_api(self, api_server):
         """Test move command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -371,7 +352,6 @@ class TestAPIToMiddlewareCommandTypes:
         assert response.command == 'move'
         assert 'gcode' in response.data
     
-    @pytest_asyncio.asyncio_test
     async def test_pick_command_through_api(self, api_server):
         """Test pick command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -391,7 +371,6 @@ class TestAPIToMiddlewareCommandTypes:
         assert response.status == ResponseStatus.SUCCESS
         assert response.command == 'pick'
     
-    @pytest_asyncio.asyncio_test
     async def test_place_command_through_api(self, api_server):
         """Test place command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -411,7 +390,6 @@ class TestAPIToMiddlewareCommandTypes:
         assert response.status == ResponseStatus.SUCCESS
         assert response.command == 'place'
     
-    @pytest_asyncio.asyncio_test
     async def test_vacuum_command_through_api(self, api_server):
         """Test vacuum command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -431,7 +409,6 @@ class TestAPIToMiddlewareCommandTypes:
         assert response.status == ResponseStatus.SUCCESS
         assert response.command == 'vacuum_on'
     
-    @pytest_asyncio.asyncio_test
     async def test_fan_command_through_api(self, api_server):
         """Test fan command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -451,7 +428,6 @@ class TestAPIToMiddlewareCommandTypes:
         assert response.status == ResponseStatus.SUCCESS
         assert response.command == 'fan_set'
     
-    @pytest_asyncio.asyncio_test
     async def test_gpio_command_through_api(self, api_server):
         """Test GPIO command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -471,7 +447,6 @@ class TestAPIToMiddlewareCommandTypes:
         assert response.status == ResponseStatus.SUCCESS
         assert response.command == 'gpio_read'
     
-    @pytest_asyncio.asyncio_test
     async def test_sensor_command_through_api(self, api_server):
         """Test sensor command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -491,7 +466,6 @@ class TestAPIToMiddlewareCommandTypes:
         assert response.status == ResponseStatus.SUCCESS
         assert response.command == 'sensor_read'
     
-    @pytest_asyncio.asyncio_test
     async def test_home_command_through_api(self, api_server):
         """Test home command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -511,7 +485,6 @@ class TestAPIToMiddlewareCommandTypes:
         assert response.status == ResponseStatus.SUCCESS
         assert response.command == 'home'
     
-    @pytest_asyncio.asyncio_test
     async def test_status_command_through_api(self, api_server):
         """Test status command execution through API to middleware."""
         command = OpenPNPCommand(
@@ -3,7 +3,6 @@
 # Tests for complete authentication and authorization flow
 
 import pytest
-import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 import time
 
@@ -16,190 +15,130 @@ from api.auth import (
 )
 from api.server import APIServer
 
+pytestmark = pytest.mark.integration
 
-class TestAPIKeyManagement:
-    """Test suite for API key management."""
+
+def _check_create(manager):
+    """Created keys are prefixed and stored with their settings."""
+    key_id, api_key = manager.create_key(
+        name='Test Key',
+        permissions=['read', 'write'],
+        rate_limit=100,
+        description='Test API key'
+    )
     
-    @pytest_asyncio.asyncio_test
-    async def test_create_api_key(self, api_key_manager):
-        """Test API key creation."""
-        key_id, api_key = api_key_manager.create_key(
-            name='Test Key',
-            permissions=['read', 'write'],
-            rate_limit=100,
-            description='Test API key'
-        )
-        
-        # Verify key was created
-        assert key_id is not None
-        assert api_key is not None
-        assert api_key.startswith('kp_')
-        
-        # Verify key is stored
-        stored_key = api_key_manager.get_key(key_id)
-        assert stored_key is not None
-        assert stored_key.name == 'Test Key'
-        assert stored_key.permissions == ['read', 'write']
-        assert stored_key.rate_limit == 100
-    
-    @pytest_asyncio.asyncio_test
-    async def test_validate_api_key(self, api_key_manager):
-        """Test API key validation."""
-        # Create a key
-        key_id, api_key = api_key_manager.create_key(
-            name='Test Key',
-            permissions=['read', 'write'],
-            rate_limit=100
-        )
-        
-        # Validate the key
-        validated_key = api_key_manager.validate_key(api_key)
-        
-        # Verify validation
-        assert validated_key is not None
-        assert validated_key.key_id == key_id
-        assert validated_key.name == 'Test Key'
-        assert validated_key.is_active == True
-        
-        # Validate with wrong key
-        wrong_key = 'kp_wrong_key_12345678'
-        validated_wrong = api_key_manager.validate_key(wrong_key)
-        assert validated_wrong is None
+    assert key_id is not None
+    assert api_key is not None
+    assert api_key.startswith('kp_')
     
-    @pytest_asyncio.asyncio_test
-    async def test_list_api_keys(self, api_key_manager):
-        """Test listing API keys."""
-        # Create multiple keys
-        key_id_1, _ = api_key_manager.create_key(
-            name='Key 1',
-            permissions=['read'],
-            rate_limit=50
-        )
-        key_id_2, _ = api_key_manager.create_key(
-            name='Key 2',
-            permissions=['write'],
-            rate_limit=100
-        )
-        
-        # List keys
-        keys = api_key_manager.list_keys()
-        
-        # Verify listing
-        assert len(keys) >= 2
-        key_ids = [k['key_id'] for k in keys]
-        assert key_id_1 in key_ids
-        assert key_id_2 in key_ids
+    stored_key = manager.get_key(key_id)
+    assert stored_key is not None
+    assert stored_key.name == 'Test Key'
+    assert stored_key.permissions == {'read', 'write'}
+    assert stored_key.rate_limit == 100
+
+
+def _check_validate(manager):
+    """Valid keys resolve to their record, unknown keys to None."""
+    key_id, api_key = manager.create_key(
+        name='Test Key',
+        permissions=['read', 'write'],
+        rate_limit=100
+    )
     
-    @pytest_asyncio.asyncio_test
-    async def test_update_api_key(self, api_key_manager):
-        """Test updating API key."""
-        # Create a key
-        key_id, _ = api_key_manager.create_key(
-            name='Test Key',
-            permissions=['read'],
-            rate_limit=100
-        )
-        
-        # Update the key
-        success = api_key_manager.update_key(
-            key_id,
-            name='Updated Key',
-            permissions=['read', 'write', 'admin'],
-            rate_limit=200
-        )
-        
-        # Verify update
-        assert success == True
-        
-        # Verify updated values
-        updated_key = api_key_manager.get_key(key_id)
-        assert updated_key.name == 'Updated Key'
-        assert updated_key.permissions == ['read', 'write', 'admin']
-        assert updated_key.rate_limit == 200
+    validated_key = manager.validate_key(api_key)
+    assert validated_key is not None
+    assert validated_key.key_id == key_id
+    assert validated_key.name == 'Test Key'
+    assert validated_key.is_active == True
     
-    @pytest_asyncio.asyncio_test
-    async def test_delete_api_key(self, api_key_manager):
-        """Test deleting API key."""
-        # Create a key
-        key_id, _ = api_key_manager.create_key(
-            name='Test Key',
-            permissions=['read'],
-            rate_limit=100
-        )
-        
-        # Verify key exists
-        assert api_key_manager.get_key(key_id) is not None
-        
-        # Delete the key
-        success = api_key_manager.delete_key(key_id)
-        
-        # Verify deletion
-        assert success == True
-        assert api_key_manager.get_key(key_id) is None
+    assert manager.validate_key('kp_wrong_key_12345678') is None
+
+
+def _check_list(manager):
+    """Listing returns every created key."""
+    key_id_1, _ = manager.create_key(name='Key 1', permissions=['read'], rate_limit=50)
+    key_id_2, _ = manager.create_key(name='Key 2', permissions=['write'], rate_limit=100)
     
-    @pytest_asyncio.asyncio_test
-    async def test_api_key_permissions(self, api_key_manager):
-        """Test API key permission checking."""
-        # Create key with specific permissions
-        key_id, api_key = api_key_manager.create_key(
-            name='Admin Key',
-            permissions=['admin'],
-            rate_limit=100
-        )
-        
-        # Check permissions
-        validated_key = api_key_manager.validate_key(api_key)
-        
-        # Verify admin permission
-        assert api_key_manager.check_permission(validated_key, 'admin') == True
-        assert api_key_manager.check_permission(validated_key, 'read') == True
-        assert api_key_manager.check_permission(validated_key, 'write') == True
-        
-        # Create key with limited permissions
-        key_id_2, api_key_2 = api_key_manager.create_key(
-            name='Read Only Key',
-            permissions=['read'],
-            rate_limit=100
-        )
-        
-        validated_key_2 = api_key_manager.validate_key(api_key_2)
-        
-        # Verify limited permissions
-        assert api_key_manager.check_permission(validated_key_2, 'admin') == False
-        assert api_key_manager.check_permission(validated_key_2, 'read') == True
-        assert api_key_manager.check_permission(validated_key_2, 'write') == False
+    keys = manager.list_keys()
+    assert len(keys) >= 2
+    key_ids = [k['key_id'] for k in keys]
+    assert key_id_1 in key_ids
+    assert key_id_2 in key_ids
+
+
+def _check_update(manager):
+    """Updated fields are persisted on the key."""
+    key_id, _ = manager.create_key(name='Test Key', permissions=['read'], rate_limit=100)
     
-    @pytest_asyncio.asyncio_test
-    async def test_api_key_deactivation(self, api_key_manager):
-        """Test API key deactivation."""
-        # Create a key
-        key_id, api_key = api_key_manager.create_key(
-            name='Test Key',
-            permissions=['read'],
-            rate_limit=100
-        )
-        
-        # Verify key is active
-        validated_key = api_key_manager.validate_key(api_key)
-        assert validated_key.is_active == True
-        
-        # Deactivate the key
-        success = api_key_manager.update_key(key_id, is_active=False)
-        assert success == True
-        
-        # Verify deactivation
-        deactivated_key = api_key_manager.get_key(key_id)
-        assert deactivated_key.is_active == False
-        
-        # Verify deactivated key cannot be used
-        validated_deactivated = api_key_manager.validate_key(api_key)
-        assert validated_deactivated is None
+    success = manager.update_key(
+        key_id,
+        name='Updated Key',
+        permissions=['read', 'write', 'admin'],
+        rate_limit=200
+    )
+    assert success == True
+    
+    updated_key = manager.get_key(key_id)
+    assert updated_key.name == 'Updated Key'
+    assert updated_key.permissions == {'read', 'write', 'admin'}
+    assert updated_key.rate_limit == 200
+
+
+def _check_delete(manager):
+    """Deleted keys can no longer be looked up."""
+    key_id, _ = manager.create_key(name='Test Key', permissions=['read'], rate_limit=100)
+    assert manager.get_key(key_id) is not None
+    
+    assert manager.delete_key(key_id) == True
+    assert manager.get_key(key_id) is None
+
+
+def _check_permissions(manager):
+    """Admin implies every permission; other keys only hold their own."""
+    _, admin_key = manager.create_key(name='Admin Key', permissions=['admin'], rate_limit=100)
+    validated_key = manager.validate_key(admin_key)
+    assert manager.check_permission(validated_key, 'admin') == True
+    assert manager.check_permission(validated_key, 'read') == True
+    assert manager.check_permission(validated_key, 'write') == True
+    
+    _, read_key = manager.create_key(name='Read Only Key', permissions=['read'], rate_limit=100)
+    validated_key_2 = manager.validate_key(read_key)
+    assert manager.check_permission(validated_key_2, 'admin') == False
+    assert manager.check_permission(validated_key_2, 'read') == True
+    assert manager.check_permission(validated_key_2, 'write') == False
+
+
+def _check_deactivation(manager):
+    """Deactivated keys are kept but no longer validate."""
+    key_id, api_key = manager.create_key(name='Test Key', permissions=['read'], rate_limit=100)
+    assert manager.validate_key(api_key).is_active == True
+    
+    assert manager.update_key(key_id, is_active=False) == True
+    assert manager.get_key(key_id).is_active == False
+    assert manager.validate_key(api_key) is None
+
+
+class TestAPIKeyManagement:
+    """Test suite for API key management."""
+    
+    @pytest.mark.parametrize('check', [
+        pytest.param(_check_create, id='create'),
+        pytest.param(_check_validate, id='validate'),
+        pytest.param(_check_list, id='list'),
+        pytest.param(_check_update, id='update'),
+        pytest.param(_check_delete, id='delete'),
+        pytest.param(_check_permissions, id='permissions'),
+        pytest.param(_check_deactivation, id='deactivation'),
+    ])
+    def test_key_operation(self, api_key_manager, check):
+        """Test a single API key management operation."""
+        check(api_key_manager)
 
 
 class TestRateLimiting:
     """Test suite for rate limiting."""
     
-    @pytest_asyncio.asyncio_test
     async def test_rate_limit_tracking(self, api_key_manager):
         """Test rate limit tracking."""
         # Create a key
@@ -216,20 +155,17 @@ class TestRateLimiting:
         assert api_key_manager.check_rate_limit(validated_key) == True
         
         # Record requests
-        for i in range(3):
-            api_key_manager.record_request(validated_key)
+        api_key_manager.record_requests(validated_key, 3)
         
         # Check rate limit after requests
         assert api_key_manager.check_rate_limit(validated_key) == True
         
         # Record more requests to exceed limit
-        for i in range(3):
-            api_key_manager.record_request(validated_key)
+        api_key_manager.record_requests(validated_key, 3)
         
         # Check rate limit exceeded
         assert api_key_manager.check_rate_limit(validated_key) == False
     
-    @pytest_asyncio.asyncio_test
     async def test_rate_limit_info(self, api_key_manager):
         """Test rate limit information."""
         # Create a key
@@ -243,8 +179,7 @@ class TestRateLimiting:
         validated_key = api_key_manager.validate_key(api_key)
         
         # Record some requests
-        for i in range(3):
-            api_key_manager.record_request(validated_key)
+        api_key_manager.record_requests(validated_key, 3)
         
         # Get rate limit info
         info = api_key_manager.get_rate_limit_info(validated_key)
@@ -255,7 +190,6 @@ class TestRateLimiting:
         assert 'reset' in info
         assert info['remaining'] == info['limit'] - 3
     
-    @pytest_asyncio.asyncio_test
     async def test_rate_limit_window_cleanup(self, api_key_manager):
         """Test rate limit window cleanup."""
         # Create a key
@@ -280,7 +214,6 @@ class TestRateLimiting:
         assert len(tracker.requests) == 0
         assert tracker.count_requests() == 0
     
-    @pytest_asyncio.asyncio_test
     async def test_rate_limit_multiple_keys(self, api_key_manager):
         """Test rate limiting with multiple keys."""
         # Create multiple keys
@@ -300,12 +233,10 @@ class TestRateLimiting:
         validated_key_2 = api_key_manager.validate_key(api_key_2)
         
         # Record requests for key 1
-        for i in range(4):
-            api_key_manager.record_request(validated_key_1)
+        api_key_manager.record_requests(validated_key_1, 4)
         
         # Record requests for key 2
-        for i in range(4):
-            api_key_manager.record_request(validated_key_2)
+        api_key_manager.record_requests(validated_key_2, 4)
         
         # Check rate limits
         assert api_key_manager.check_rate_limit(validated_key_1) == True  # 4/5
@@ -315,7 +246,6 @@ class TestRateLimiting:
 class TestAuthMiddleware:
     """Test suite for authentication middleware."""
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_middleware_skip_on_disabled(self, auth_manager):
         """Test that auth is skipped when disabled."""
         key_manager, middleware, auth_logger = auth_manager
@@ -337,7 +267,6 @@ class TestAuthMiddleware:
         # Verify request passed through
         assert response is not None
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_middleware_require_api_key(self, auth_manager):
         """Test that auth requires API key when enabled."""
         key_manager, middleware, auth_logger = auth_manager
@@ -360,7 +289,6 @@ class TestAuthMiddleware:
         assert response is not None
         assert response.status == 401
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_middleware_valid_api_key(self, auth_manager):
         """Test that auth accepts valid API key."""
         key_manager, middleware, auth_logger = auth_manager
@@ -390,7 +318,6 @@ class TestAuthMiddleware:
         assert response is not None
         assert response.status == 200
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_middleware_invalid_api_key(self, auth_manager):
         """Test that auth rejects invalid API key."""
         key_manager, middleware, auth_logger = auth_manager
@@ -413,7 +340,6 @@ class TestAuthMiddleware:
         assert response is not None
         assert response.status == 401
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_middleware_public_endpoint(self, auth_manager):
         """Test that public endpoints bypass auth."""
         key_manager, middleware, auth_logger = auth_manager
@@ -439,7 +365,6 @@ class TestAuthMiddleware:
         assert response is not None
         assert response.status == 200
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_middleware_rate_limit_exceeded(self, auth_manager):
         """Test that auth blocks when rate limit exceeded."""
         key_manager, middleware, auth_logger = auth_manager
@@ -453,8 +378,7 @@ class TestAuthMiddleware:
         
         # Exceed rate limit
         validated_key = key_manager.validate_key(api_key)
-        for i in range(2):
-            key_manager.record_request(validated_key)
+        key_manager.record_requests(validated_key, 2)
         
         # Create mock request with API key
         mock_request = MagicMock()
@@ -474,7 +398,6 @@ class TestAuthMiddleware:
         assert response is not None
         assert response.status == 429
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_middleware_rate_limit_headers(self, auth_manager):
         """Test that rate limit headers are added."""
         key_manager, middleware, auth_logger = auth_manager
@@ -517,7 +440,6 @@ class TestAuthMiddleware:
 class TestAuthLogger:
     """Test suite for authentication logger."""
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_log_success(self, auth_manager):
         """Test successful authentication logging."""
         key_manager, middleware, auth_logger = auth_manager
@@ -535,7 +457,6 @@ class TestAuthLogger:
         # Verify no failed attempts
         assert auth_logger.get_failed_attempts('127.0.0.1') == 0
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_log_failure(self, auth_manager):
         """Test failed authentication logging."""
         key_manager, middleware, auth_logger = auth_manager
@@ -546,7 +467,6 @@ class TestAuthLogger:
         # Verify failed attempt was logged
         assert auth_logger.get_failed_attempts('127.0.0.1') == 1
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_log_multiple_failures(self, auth_manager):
         """Test multiple failed authentication logging."""
         key_manager, middleware, auth_logger = auth_manager
@@ -558,7 +478,6 @@ class TestAuthLogger:
         # Verify failed attempts
         assert auth_logger.get_failed_attempts('127.0.0.1') == 5
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_log_old_failures_cleanup(self, auth_manager):
         """Test that old failures are cleaned up."""
         key_manager, middleware, auth_logger = auth_manager
@@ -573,7 +492,6 @@ class TestAuthLogger:
         # Verify old failures were cleaned up
         assert len(auth_logger.failed_attempts['127.0.0.1']) == 1
     
-    @pytest_asyncio.asyncio_test
     async def test_auth_ip_blocking(self, auth_manager):
         """Test IP blocking after multiple failures."""
         key_manager, middleware, auth_logger = auth_manager
@@ -592,7 +510,6 @@ class TestAuthLogger:
 class TestCompleteAuthFlow:
     """Test suite for complete authentication flow."""
     
-    @pytest_asyncio.asyncio_test
     async def test_complete_auth_flow_success(self, auth_manager):
         """Test complete authentication flow with success."""
         key_manager, middleware, auth_logger = auth_manager
@@ -626,7 +543,6 @@ class TestCompleteAuthFlow:
         assert 'X-RateLimit-Limit' in response.headers
         assert auth_logger.get_failed_attempts('192.168.1.1') == 0
     
-    @pytest_asyncio.asyncio_test
     async def test_complete_auth_flow_failure(self, auth_manager):
         """Test complete authentication flow with failure."""
         key_manager, middleware, auth_logger = auth_manager
@@ -651,7 +567,6 @@ class TestCompleteAuthFlow:
         assert response.status == 401
         assert auth_logger.get_failed_attempts('192.168.1.1') == 1
     
-    @pytest_asyncio.asyncio_test
     async def test_complete_auth_flow_rate_limit(self, auth_manager):
         """Test complete authentication flow with rate limiting."""
         key_manager, middleware, auth_logger = auth_manager
@@ -665,8 +580,7 @@ class TestCompleteAuthFlow:
         
         # Exceed rate limit
         validated_key = key_manager.validate_key(api_key)
-        for i in range(3):
-            key_manager.record_request(validated_key)
+        key_manager.record_requests(validated_key, 3)
         
         # Create mock request
         mock_request = MagicMock()
@@ -690,7 +604,6 @@ class TestCompleteAuthFlow:
         assert 'X-RateLimit-Limit' in response.headers
         assert 'X-RateLimit-Remaining' in response.headers
     
-    @pytest_asyncio.asyncio_test
     async def test_complete_auth_flow_ip_blocking(self, auth_manager):
         """Test complete authentication flow with IP blocking."""
         key_manager, middleware, auth_logger = auth_manager
@@ -719,7 +632,6 @@ class TestCompleteAuthFlow:
         assert response.status == 429
         assert auth_logger.is_ip_blocked('10.0.0.1', threshold=10) == True
     
-    @pytest_asyncio.asyncio_test
     async def test_complete_auth_flow_permission_check(self, auth_manager):
         """Test complete authentication flow with permission checking."""
         key_manager, middleware, auth_logger = auth_manager
@@ -2,13 +2,12 @@
 # Integration Tests: Middleware to G-code Driver
 # Tests the integration between middleware translator and G-code driver components
 
+import time
+
 import pytest
-import pytest_asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
-import asyncio
+from unittest.mock import AsyncMock
 
 from middleware.translator import (
-    OpenPNPTranslator,
     OpenPNPCommand,
     OpenPNPCommandType,
     OpenPNPResponse,
@@ -17,31 +16,107 @@ from middleware.translator import (
 )
 from gcode_driver.translator import (
     CommandTranslator,
-    MoonrakerClient,
     ExecutionResult,
-    ExecutionStatus,
-    TranslationContext
+    ExecutionStatus
 )
-from gcode_driver.parser import (
-    GCodeParser,
-    GCodeCommand,
-    GCodeCommandType
+from gcode_driver.handlers import ExecutionHistoryEntry
+
+# Tests share the session's translator, which is reset after each test, so the
+# file runs as a unit alongside other integration modules under
+# `make test-integration` (pytest-xdist, --dist=loadfile).
+pytestmark = pytest.mark.integration
+
+# Commands shared by tests that only read them; build a fresh one to mutate
+_MOVE_CMD = OpenPNPCommand(
+    command_type=OpenPNPCommandType.MOVE,
+    parameters={'x': 100.0, 'y': 50.0, 'z': 10.0}
 )
+_GPIO_READ_CMD = OpenPNPCommand(
+    command_type=OpenPNPCommandType.GPIO_READ,
+    parameters={'pin': 'PA1'}
+)
+_GET_STATUS_CMD = OpenPNPCommand(command_type=OpenPNPCommandType.GET_STATUS)
+
+
+def _async_return(value):
+    """Build a coroutine function that ignores its arguments and returns value."""
+    async def async_return(*args, **kwargs):
+        return value
+    return async_return
+
+
+def _gcode_lines(gcode):
+    """Split G-code into one set of words per line."""
+    return [frozenset(line.split()) for line in gcode.splitlines()]
+
+
+def _history_entry(gcode, status, execution_time):
+    """Build a handler history entry for an already executed G-code line."""
+    return ExecutionHistoryEntry(
+        id=gcode,
+        gcode=gcode,
+        status=status,
+        timestamp=time.time(),
+        execution_time=execution_time
+    )
+
+
+def _spy_coro(value):
+    """Build a coroutine function that returns value and records its calls.
+    
+    Each call is appended to the function's ``calls`` list as (args, kwargs).
+    """
+    calls = []
+    
+    async def spy(*args, **kwargs):
+        calls.append((args, kwargs))
+        return value
+    
+    spy.calls = calls
+    return spy
+
+
+class _MockResponse:
+    """Successful Moonraker HTTP response with a fixed JSON payload."""
+    
+    status = 200
+    
+    def __init__(self, payload):
+        self._payload = payload
+    
+    async def json(self):
+        return self._payload
+
+
+class _MockRequest:
+    """Request context manager yielding a fixed Moonraker response."""
+    
+    def __init__(self, payload):
+        self._response = _MockResponse(payload)
+    
+    async def __aenter__(self):
+        return self._response
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def _mock_request(payload):
+    """Build a session.get/post replacement that always returns one response."""
+    return lambda *args, **kwargs: _MockRequest(payload)
 
 
 class TestMiddlewareToGCodeDriverIntegration:
     """Test suite for middleware to G-code driver integration."""
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_initializes_gcode_translator(self, openpnp_translator):
+    def test_translator_initializes_gcode_translator(self, openpnp_translator):
         """Test that OpenPNP translator initializes G-code translator."""
         assert openpnp_translator.gcode_translator is not None
         assert isinstance(openpnp_translator.gcode_translator, CommandTranslator)
         assert openpnp_translator.gcode_translator.moonraker_host == 'localhost'
         assert openpnp_translator.gcode_translator.moonraker_port == 7125
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_initializes_execution_handler(self, openpnp_translator):
+    def test_translator_initializes_execution_handler(self, openpnp_translator):
         """Test that OpenPNP translator initializes execution handler."""
         # Access execution handler
         handler = openpnp_translator._get_execution_handler()
@@ -51,8 +126,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert hasattr(handler, 'enqueue_command')
         assert hasattr(handler, 'process_queue')
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_strategy_mapping(self, openpnp_translator):
+    def test_translator_strategy_mapping(self, openpnp_translator):
         """Test that translator has correct strategy mappings."""
         # Check direct API commands
         assert openpnp_translator._get_strategy(OpenPNPCommandType.GPIO_READ) == TranslationStrategy.DIRECT_API
@@ -70,149 +144,74 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert openpnp_translator._get_strategy(OpenPNPCommandType.GET_STATUS) == TranslationStrategy.HYBRID
         assert openpnp_translator._get_strategy(OpenPNPCommandType.GET_POSITION) == TranslationStrategy.HYBRID
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_convert_to_gcode_move(self, openpnp_translator):
-        """Test G-code conversion for move command."""
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.MOVE,
-            parameters={'x': 100.0, 'y': 50.0, 'z': 10.0, 'feedrate': 1500.0}
-        )
-        
-        gcode = openpnp_translator._convert_to_gcode(command)
-        
-        assert 'G0' in gcode
-        assert 'X100.0' in gcode
-        assert 'Y50.0' in gcode
-        assert 'Z10.0' in gcode
-        assert 'F1500.0' in gcode
-    
-    @pytest_asyncio.asyncio_test
-    async def test_translator_convert_to_gcode_pick(self, openpnp_translator):
-        """Test G-code conversion for pick command."""
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.PICK,
-            parameters={'z': 0.0, 'vacuum_power': 255, 'travel_height': 5.0, 'feedrate': 1500.0}
-        )
-        
-        gcode = openpnp_translator._convert_to_gcode(command)
-        
-        assert 'G0 Z0.0' in gcode
-        assert 'M106 S255' in gcode
-        assert 'G0 Z5.0' in gcode
-    
-    @pytest_asyncio.asyncio_test
-    async def test_translator_convert_to_gcode_place(self, openpnp_translator):
-        """Test G-code conversion for place command."""
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.PLACE,
-            parameters={'z': 0.0, 'travel_height': 5.0, 'feedrate': 1500.0}
-        )
-        
-        gcode = openpnp_translator._convert_to_gcode(command)
-        
-        assert 'G0 Z0.0' in gcode
-        assert 'M107' in gcode
-        assert 'G0 Z5.0' in gcode
-    
-    @pytest_asyncio.asyncio_test
-    async def test_translator_convert_to_gcode_pick_and_place(self, openpnp_translator):
-        """Test G-code conversion for pick and place command."""
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.PICK_AND_PLACE,
-            parameters={
+    @pytest.mark.parametrize('command_type, parameters, expected', [
+        pytest.param(
+            OpenPNPCommandType.MOVE,
+            {'x': 100.0, 'y': 50.0, 'z': 10.0, 'feedrate': 1500.0},
+            ('G0 X100.0 Y50.0 Z10.0 F1500.0',),
+            id='move'
+        ),
+        pytest.param(
+            OpenPNPCommandType.PICK,
+            {'z': 0.0, 'vacuum_power': 255, 'travel_height': 5.0, 'feedrate': 1500.0},
+            ('G0 Z0.0', 'M106 S255', 'G0 Z5.0'),
+            id='pick'
+        ),
+        pytest.param(
+            OpenPNPCommandType.PLACE,
+            {'z': 0.0, 'travel_height': 5.0, 'feedrate': 1500.0},
+            ('G0 Z0.0', 'M107', 'G0 Z5.0'),
+            id='place'
+        ),
+        pytest.param(
+            OpenPNPCommandType.PICK_AND_PLACE,
+            {
                 'x': 100.0, 'y': 50.0,
                 'place_x': 200.0, 'place_y': 100.0,
                 'pick_height': 0.0, 'place_height': 0.0,
                 'safe_height': 10.0, 'vacuum_power': 255,
                 'feedrate': 1500.0
-            }
-        )
-        
-        gcode = openpnp_translator._convert_to_gcode(command)
-        
-        # Verify all expected G-code commands are present
-        assert 'G0 Z10.0' in gcode
-        assert 'G0 X100.0 Y50.0' in gcode
-        assert 'G0 Z0.0' in gcode
-        assert 'M106 S255' in gcode
-        assert 'G0 X200.0 Y100.0' in gcode
-        assert 'M107' in gcode
-    
-    @pytest_asyncio.asyncio_test
-    async def test_translator_convert_to_gcode_vacuum(self, openpnp_translator):
-        """Test G-code conversion for vacuum commands."""
-        # Test vacuum on
-        command_on = OpenPNPCommand(
-            command_type=OpenPNPCommandType.VACUUM_ON,
-            parameters={'power': 200}
-        )
-        gcode_on = openpnp_translator._convert_to_gcode(command_on)
-        assert 'M106 S200' in gcode_on
-        
-        # Test vacuum off
-        command_off = OpenPNPCommand(
-            command_type=OpenPNPCommandType.VACUUM_OFF,
-            parameters={}
-        )
-        gcode_off = openpnp_translator._convert_to_gcode(command_off)
-        assert 'M107' in gcode_off
-    
-    @pytest_asyncio.asyncio_test
-    async def test_translator_convert_to_gcode_fan(self, openpnp_translator):
-        """Test G-code conversion for fan commands."""
-        # Test fan on
-        command_on = OpenPNPCommand(
-            command_type=OpenPNPCommandType.FAN_ON,
-            parameters={'speed': 200}
-        )
-        gcode_on = openpnp_translator._convert_to_gcode(command_on)
-        assert 'M106 S200' in gcode_on
-        
-        # Test fan off
-        command_off = OpenPNPCommand(
-            command_type=OpenPNPCommandType.FAN_OFF,
-            parameters={}
-        )
-        gcode_off = openpnp_translator._convert_to_gcode(command_off)
-        assert 'M107' in gcode_off
-    
-    @pytest_asyncio.asyncio_test
-    async def test_translator_convert_to_gcode_home(self, openpnp_translator):
+            },
+            ('G0 Z10.0', 'G0 X100.0 Y50.0', 'G0 Z0.0', 'M106 S255', 'G0 X200.0 Y100.0', 'M107'),
+            id='pick_and_place'
+        ),
+        pytest.param(OpenPNPCommandType.VACUUM_ON, {'power': 200}, ('M106 S200',), id='vacuum_on'),
+        pytest.param(OpenPNPCommandType.VACUUM_OFF, {}, ('M107',), id='vacuum_off'),
+        pytest.param(OpenPNPCommandType.FAN_ON, {'speed': 200}, ('M106 S200',), id='fan_on'),
+        pytest.param(OpenPNPCommandType.FAN_OFF, {}, ('M107',), id='fan_off'),
+        pytest.param(
+            OpenPNPCommandType.ACTUATE,
+            {'pin': 'PA1', 'value': 1},
+            ('SET_PIN PIN=PA1 VALUE=1',),
+            id='actuate'
+        ),
+    ])
+    def test_translator_convert_to_gcode(self, openpnp_translator, command_type, parameters, expected):
+        """Test that G-code conversion emits the expected fragments."""
+        command = OpenPNPCommand(command_type=command_type, parameters=parameters)
+        
+        lines = _gcode_lines(openpnp_translator._convert_to_gcode(command))
+        
+        # Each fragment's words must appear together on one line
+        for fragment in expected:
+            assert any(set(fragment.split()) <= line for line in lines), fragment
+    
+    @pytest.mark.parametrize('axes, expected', [
+        ('all', 'G28'),
+        ('XY', 'G28 XY'),
+    ], ids=['all', 'xy'])
+    def test_translator_convert_to_gcode_home(self, openpnp_translator, axes, expected):
         """Test G-code conversion for home command."""
-        # Test home all
-        command_all = OpenPNPCommand(
+        command = OpenPNPCommand(
             command_type=OpenPNPCommandType.HOME,
-            parameters={'axes': 'all'}
+            parameters={'axes': axes}
         )
-        gcode_all = openpnp_translator._convert_to_gcode(command_all)
-        assert gcode_all == 'G28'
         
-        # Test home specific axis
-        command_xy = OpenPNPCommand(
-            command_type=OpenPNPCommandType.HOME,
-            parameters={'axes': 'XY'}
-        )
-        gcode_xy = openpnp_translator._convert_to_gcode(command_xy)
-        assert gcode_xy == 'G28 XY'
+        assert openpnp_translator._convert_to_gcode(command) == expected
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_convert_to_gcode_actuator(self, openpnp_translator):
-        """Test G-code conversion for actuator commands."""
-        # Test actuate
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.ACTUATE,
-            parameters={'pin': 'PA1', 'value': 1}
-        )
-        gcode = openpnp_translator._convert_to_gcode(command)
-        assert 'SET_PIN PIN=PA1 VALUE=1' in gcode
-    
-    @pytest_asyncio.asyncio_test
     async def test_translator_execute_gcode_delegates_to_handler(self, openpnp_translator):
         """Test that G-code execution delegates to execution handler."""
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.MOVE,
-            parameters={'x': 100.0, 'y': 50.0, 'z': 10.0}
-        )
+        command = _MOVE_CMD
         
         # Mock execution handler
         handler = openpnp_translator._get_execution_handler()
@@ -221,35 +220,24 @@ class TestMiddlewareToGCodeDriverIntegration:
             gcode='G0 X100.0 Y50.0 Z10.0',
             execution_time=0.1
         )
-        handler.execute_single = AsyncMock(return_value=expected_result)
+        handler.execute_single = _spy_coro(expected_result)
         
         # Execute command
         response = await openpnp_translator._execute_gcode(command)
         
         # Verify delegation
-        handler.execute_single.assert_called_once()
+        assert len(handler.execute_single.calls) == 1
         assert response.status == ResponseStatus.SUCCESS
         assert 'gcode' in response.data
     
-    @pytest_asyncio.asyncio_test
     async def test_translator_execute_direct_api(self, openpnp_translator):
         """Test that direct API commands are executed correctly."""
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.GPIO_READ,
-            parameters={'pin': 'PA1'}
-        )
+        command = _GPIO_READ_CMD
         
         # Mock Moonraker client
         mock_client = openpnp_translator.gcode_translator.get_moonraker_client()
         
-        async def mock_get(url, headers=None):
-            class MockResponse:
-                status = 200
-                async def json(self):
-                    return {'success': True, 'pin': 'PA1', 'value': 1}
-            return MockResponse()
-        
-        mock_client.session.get = mock_get
+        mock_client.session.get = _mock_request({'success': True, 'pin': 'PA1', 'value': 1})
         
         # Execute command
         response = await openpnp_translator._execute_direct_api(command)
@@ -258,24 +246,16 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert response.status == ResponseStatus.SUCCESS
         assert response.data is not None
     
-    @pytest_asyncio.asyncio_test
     async def test_translator_execute_hybrid(self, openpnp_translator):
         """Test that hybrid commands combine API and G-code."""
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.GET_STATUS,
-            parameters={}
-        )
+        command = _GET_STATUS_CMD
         
         # Mock required methods
-        async def mock_get_printer_status():
-            return {'state': 'ready', 'print_stats': {'state': 'idle'}}
-        
-        async def mock_get_klippy_state():
-            return 'ready'
-        
         mock_client = openpnp_translator.gcode_translator.get_moonraker_client()
-        mock_client.get_printer_status = mock_get_printer_status
-        mock_client.get_klippy_state = mock_get_klippy_state
+        mock_client.get_printer_status = _async_return(
+            {'state': 'ready', 'print_stats': {'state': 'idle'}}
+        )
+        mock_client.get_klippy_state = _async_return('ready')
         
         # Execute command
         response = await openpnp_translator._execute_hybrid(command)
@@ -286,101 +266,51 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert 'klippy_state' in response.data
         assert 'internal_state' in response.data
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_state_updates_on_success(self, openpnp_translator):
+    @pytest.mark.parametrize('command_type, parameters, state_key, expected', [
+        pytest.param(
+            OpenPNPCommandType.MOVE,
+            {'x': 100.0, 'y': 50.0, 'z': 10.0},
+            'current_position', {'x': 100.0, 'y': 50.0, 'z': 10.0},
+            id='move'
+        ),
+        pytest.param(OpenPNPCommandType.VACUUM_ON, {'power': 200}, 'vacuum_enabled', True, id='vacuum_on'),
+        pytest.param(OpenPNPCommandType.VACUUM_OFF, {}, 'vacuum_enabled', False, id='vacuum_off'),
+        pytest.param(OpenPNPCommandType.FAN_SET, {'speed': 0.5}, 'fan_speed', 0.5, id='fan_set'),
+    ])
+    async def test_translator_state_updates(self, openpnp_translator, command_type,
+                                            parameters, state_key, expected):
         """Test that translator state updates on successful commands."""
-        # Execute move command
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.MOVE,
-            parameters={'x': 100.0, 'y': 50.0, 'z': 10.0}
-        )
+        command = OpenPNPCommand(command_type=command_type, parameters=parameters)
         
-        expected_response = OpenPNPResponse(
-            status=ResponseStatus.SUCCESS,
-            command='move',
-            data={'gcode': 'G0 X100.0 Y50.0 Z10.0'}
+        # Mock the G-code handler and the Moonraker API behind the translator
+        handler = openpnp_translator._get_execution_handler()
+        handler.execute_single = _async_return(
+            ExecutionResult(status=ExecutionStatus.COMPLETED, gcode='', execution_time=0.1)
         )
-        openpnp_translator.translate_and_execute = AsyncMock(return_value=expected_response)
+        mock_client = openpnp_translator.gcode_translator.get_moonraker_client()
+        mock_client.session.post = _mock_request({'success': True})
         
-        await openpnp_translator.translate_and_execute(command)
+        response = await openpnp_translator.translate_and_execute(command)
         
         # Verify state was updated
-        state = openpnp_translator.get_state()
-        assert state['current_position']['x'] == 100.0
-        assert state['current_position']['y'] == 50.0
-        assert state['current_position']['z'] == 10.0
-    
-    @pytest_asyncio.asyncio_test
-    async def test_translator_state_updates_vacuum(self, openpnp_translator):
-        """Test that vacuum state updates correctly."""
-        # Test vacuum on
-        command_on = OpenPNPCommand(
-            command_type=OpenPNPCommandType.VACUUM_ON,
-            parameters={'power': 200}
-        )
-        expected_response_on = OpenPNPResponse(
-            status=ResponseStatus.SUCCESS,
-            command='vacuum_on'
-        )
-        openpnp_translator.translate_and_execute = AsyncMock(return_value=expected_response_on)
-        
-        await openpnp_translator.translate_and_execute(command_on)
-        state_on = openpnp_translator.get_state()
-        assert state_on['vacuum_enabled'] == True
-        
-        # Test vacuum off
-        command_off = OpenPNPCommand(
-            command_type=OpenPNPCommandType.VACUUM_OFF,
-            parameters={}
-        )
-        expected_response_off = OpenPNPResponse(
-            status=ResponseStatus.SUCCESS,
-            command='vacuum_off'
-        )
-        openpnp_translator.translate_and_execute = AsyncMock(return_value=expected_response_off)
-        
-        await openpnp_translator.translate_and_execute(command_off)
-        state_off = openpnp_translator.get_state()
-        assert state_off['vacuum_enabled'] == False
-    
-    @pytest_asyncio.asyncio_test
-    async def test_translator_state_updates_fan(self, openpnp_translator):
-        """Test that fan state updates correctly."""
-        # Test fan set
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.FAN_SET,
-            parameters={'speed': 0.5}
-        )
-        expected_response = OpenPNPResponse(
-            status=ResponseStatus.SUCCESS,
-            command='fan_set'
-        )
-        openpnp_translator.translate_and_execute = AsyncMock(return_value=expected_response)
-        
-        await openpnp_translator.translate_and_execute(command)
-        state = openpnp_translator.get_state()
-        assert state['fan_speed'] == 0.5
+        assert response.status == ResponseStatus.SUCCESS
+        assert openpnp_translator.get_state()[state_key] == expected
     
-    @pytest_asyncio.asyncio_test
     async def test_translator_enqueue_command(self, openpnp_translator):
         """Test that commands can be enqueued."""
-        command = OpenPNPCommand(
-            command_type=OpenPNPCommandType.MOVE,
-            parameters={'x': 100.0, 'y': 50.0, 'z': 10.0}
-        )
+        command = _MOVE_CMD
         
         # Mock execution handler
         handler = openpnp_translator._get_execution_handler()
-        handler.enqueue_command = AsyncMock(return_value='cmd_123')
+        handler.enqueue_command = _spy_coro('cmd_123')
         
         # Enqueue command
         command_id = await openpnp_translator.enqueue_command(command, priority=0)
         
         # Verify enqueue
-        handler.enqueue_command.assert_called_once()
+        assert len(handler.enqueue_command.calls) == 1
         assert command_id == 'cmd_123'
     
-    @pytest_asyncio.asyncio_test
     async def test_translator_process_queue(self, openpnp_translator):
         """Test that queue can be processed."""
         # Mock execution handler
@@ -390,18 +320,17 @@ class TestMiddlewareToGCodeDriverIntegration:
             ExecutionResult(status=ExecutionStatus.COMPLETED, gcode='G0 X100'),
             ExecutionResult(status=ExecutionStatus.COMPLETED, gcode='G0 Y50')
         ]
-        handler.process_queue = AsyncMock(return_value=expected_results)
+        handler.process_queue = _spy_coro(expected_results)
         
         # Process queue
         responses = await openpnp_translator.process_queue(stop_on_error=False)
         
         # Verify processing
-        handler.process_queue.assert_called_once_with(stop_on_error=False)
+        assert handler.process_queue.calls == [((), {'stop_on_error': False})]
         assert len(responses) == 2
         assert all(r.status == ResponseStatus.SUCCESS for r in responses)
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_batch_execution(self, openpnp_translator):
+    async def test_translator_batch_execution(self, openpnp_translator, monkeypatch):
         """Test batch command execution."""
         commands = [
             {'command': 'move', 'parameters': {'x': 100.0}},
@@ -415,7 +344,7 @@ class TestMiddlewareToGCodeDriverIntegration:
             OpenPNPResponse(status=ResponseStatus.SUCCESS, command='move'),
             OpenPNPResponse(status=ResponseStatus.SUCCESS, command='move')
         ]
-        openpnp_translator.translate_and_execute = AsyncMock(side_effect=responses)
+        monkeypatch.setattr(openpnp_translator, 'translate_and_execute', AsyncMock(side_effect=responses))
         
         # Execute batch
         results = await openpnp_translator.execute_batch(commands, stop_on_error=False)
@@ -425,18 +354,103 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert all(r.status == ResponseStatus.SUCCESS for r in results)
         assert openpnp_translator.translate_and_execute.call_count == 3
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_error_handling(self, openpnp_translator):
+    async def test_translator_batch_execution_combined_gcode(self, openpnp_translator, monkeypatch):
+        """Test that a G-code-only batch can be sent as a single script."""
+        commands = [
+            {'command': 'move', 'parameters': {'x': 100.0}},
+            {'command': 'move', 'parameters': {'y': 50.0}},
+            {'command': 'move', 'parameters': {'z': 10.0}}
+        ]
+        
+        responses = [OpenPNPResponse(status=ResponseStatus.SUCCESS, command='move')] * 3
+        monkeypatch.setattr(openpnp_translator, 'translate_and_execute_batch', _spy_coro(responses))
+        
+        # Execute batch
+        results = await openpnp_translator.execute_batch(
+            commands, stop_on_error=False, combine_gcode=True
+        )
+        
+        # Verify one combined call instead of one per command
+        assert results == responses
+        assert len(openpnp_translator.translate_and_execute_batch.calls) == 1
+    
+    async def test_translator_batch_execution_combined_gcode_stop_on_error(self, openpnp_translator,
+                                                                          monkeypatch):
+        """Test that a failed combined script stops the rest of the batch."""
+        commands = [
+            {'command': 'move', 'parameters': {'x': 100.0}},
+            {'command': 'move', 'parameters': {'y': 50.0}},
+            {'command': 'fan_set', 'parameters': {'speed': 0.5}}
+        ]
+        
+        responses = [OpenPNPResponse(status=ResponseStatus.ERROR, command='move')] * 2
+        monkeypatch.setattr(openpnp_translator, 'translate_and_execute_batch', _spy_coro(responses))
+        monkeypatch.setattr(openpnp_translator, 'translate_and_execute', AsyncMock())
+        
+        # Execute batch
+        results = await openpnp_translator.execute_batch(commands, combine_gcode=True)
+        
+        # Verify the G-code run was combined and the fan command never ran
+        assert results == responses
+        (batched,), _ = openpnp_translator.translate_and_execute_batch.calls[0]
+        assert [cmd.command_type for cmd in batched] == [OpenPNPCommandType.MOVE] * 2
+        openpnp_translator.translate_and_execute.assert_not_called()
+    
+    async def test_translator_translate_and_execute_batch_rejects_non_gcode(self, openpnp_translator):
+        """Test that a batch holding a non-G-code command is rejected unsent."""
+        commands = [
+            OpenPNPCommand(command_type=OpenPNPCommandType.MOVE, parameters={'x': 100.0}),
+            OpenPNPCommand(command_type=OpenPNPCommandType.FAN_SET, parameters={'speed': 0.5})
+        ]
+        
+        handler = openpnp_translator._get_execution_handler()
+        handler.execute_single = AsyncMock()
+        
+        responses = await openpnp_translator.translate_and_execute_batch(commands)
+        
+        # Verify every command failed and nothing was sent
+        assert [r.status for r in responses] == [ResponseStatus.ERROR] * 2
+        assert all(r.error_code == 'BATCH_NOT_GCODE' for r in responses)
+        handler.execute_single.assert_not_called()
+    
+    async def test_translator_translate_and_execute_batch(self, openpnp_translator):
+        """Test that batched G-code runs through one handler call."""
+        commands = [
+            OpenPNPCommand(command_type=OpenPNPCommandType.MOVE, parameters={'x': 100.0}),
+            OpenPNPCommand(command_type=OpenPNPCommandType.VACUUM_ON, parameters={'power': 200})
+        ]
+        
+        # Mock execution handler
+        handler = openpnp_translator._get_execution_handler()
+        handler.execute_single = _spy_coro(
+            ExecutionResult(status=ExecutionStatus.COMPLETED, gcode='', execution_time=0.1)
+        )
+        
+        responses = await openpnp_translator.translate_and_execute_batch(commands)
+        
+        # Verify a single script carrying every command
+        assert len(handler.execute_single.calls) == 1
+        (script,), _ = handler.execute_single.calls[0]
+        assert script.splitlines() == [r.data['gcode'] for r in responses]
+        assert all(r.status == ResponseStatus.SUCCESS for r in responses)
+        assert all(r.data['execution_time'] == 0.1 for r in responses)
+        
+        # Verify state was updated for each command
+        state = openpnp_translator.get_state()
+        assert state['current_position']['x'] == 100.0
+        assert state['vacuum_enabled'] == True
+    
+    async def test_translator_error_handling(self, openpnp_translator, monkeypatch):
         """Test that translator handles errors gracefully."""
         command = OpenPNPCommand(
             command_type=OpenPNPCommandType.MOVE,
             parameters={'x': 100.0}
         )
         
-        # Mock translate_and_execute to raise an exception
-        openpnp_translator.translate_and_execute = AsyncMock(
+        # Make the G-code execution path raise
+        monkeypatch.setattr(openpnp_translator, '_execute_gcode', AsyncMock(
             side_effect=Exception('Test error')
-        )
+        ))
         
         # Execute command
         response = await openpnp_translator.translate_and_execute(command)
@@ -446,8 +460,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert response.error_message == 'Test error'
         assert response.error_code == 'EXECUTION_ERROR'
     
-    @pytest_asyncio.asyncio_test
-    async def test_gcode_translator_context_management(self, openpnp_translator):
+    def test_gcode_translator_context_management(self, openpnp_translator):
         """Test that G-code translator manages context correctly."""
         gcode_translator = openpnp_translator.gcode_translator
         
@@ -466,8 +479,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert updated_context.feedrate == 2000.0
         assert updated_context.positioning_mode == 'relative'
     
-    @pytest_asyncio.asyncio_test
-    async def test_gcode_translator_template_usage(self, openpnp_translator):
+    def test_gcode_translator_template_usage(self, openpnp_translator):
         """Test that G-code translator uses templates correctly."""
         gcode_translator = openpnp_translator.gcode_translator
         
@@ -482,8 +494,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert 'vacuum_on' in templates
         assert 'vacuum_off' in templates
     
-    @pytest_asyncio.asyncio_test
-    async def test_gcode_translator_add_custom_template(self, openpnp_translator):
+    def test_gcode_translator_add_custom_template(self, openpnp_translator):
         """Test that custom templates can be added."""
         gcode_translator = openpnp_translator.gcode_translator
         
@@ -497,8 +508,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert template_name in templates
         assert templates[template_name] == template
     
-    @pytest_asyncio.asyncio_test
-    async def test_gcode_translator_add_custom_validator(self, openpnp_translator):
+    def test_gcode_translator_add_custom_validator(self, openpnp_translator):
         """Test that custom validators can be added."""
         gcode_translator = openpnp_translator.gcode_translator
         
@@ -511,8 +521,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert param_name in gcode_translator.validators
         assert gcode_translator.validators[param_name] == validator
     
-    @pytest_asyncio.asyncio_test
-    async def test_gcode_translator_reset_context(self, openpnp_translator):
+    def test_gcode_translator_reset_context(self, openpnp_translator):
         """Test that G-code translator context can be reset."""
         gcode_translator = openpnp_translator.gcode_translator
         
@@ -529,8 +538,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert context.current_position == {'x': 0.0, 'y': 0.0, 'z': 0.0}
         assert context.positioning_mode == 'absolute'
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_command_parsing(self, openpnp_translator):
+    def test_translator_command_parsing(self, openpnp_translator):
         """Test that translator can parse command dictionaries."""
         command_dict = {
             'command': 'move',
@@ -548,8 +556,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert command.metadata == {'source': 'test'}
         assert command.priority == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_invalid_command_type(self, openpnp_translator):
+    def test_translator_invalid_command_type(self, openpnp_translator):
         """Test that translator handles invalid command types."""
         command_dict = {
             'command': 'invalid_command',
@@ -563,8 +570,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         except ValueError as e:
             assert 'Unknown command type' in str(e)
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_response_serialization(self, openpnp_translator):
+    def test_translator_response_serialization(self, openpnp_translator):
         """Test that OpenPNP responses can be serialized."""
         response = OpenPNPResponse(
             status=ResponseStatus.SUCCESS,
@@ -584,8 +590,7 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert 'command_id' in response_dict
         assert 'timestamp' in response_dict
     
-    @pytest_asyncio.asyncio_test
-    async def test_translator_response_warnings(self, openpnp_translator):
+    def test_translator_response_warnings(self, openpnp_translator):
         """Test that warnings can be added to responses."""
         response = OpenPNPResponse(
             status=ResponseStatus.SUCCESS,
@@ -602,56 +607,41 @@ class TestMiddlewareToGCodeDriverIntegration:
         assert 'Position out of bounds' in response.warnings
         assert 'High feedrate' in response.warnings
     
-    @pytest_asyncio.asyncio_test
     async def test_translator_get_statistics(self, openpnp_translator):
-        """Test that translator statistics can be retrieved."""
-        # Mock statistics
-        expected_stats = {
-            'total_commands': 10,
-            'successful_commands': 8,
-            'failed_commands': 2,
-            'average_execution_time': 0.15
-        }
-        openpnp_translator.get_statistics = AsyncMock(return_value=expected_stats)
+        """Test that translator statistics reflect the handler's history and queue."""
+        handler = openpnp_translator._get_execution_handler()
+        await handler.history.add_entry(_history_entry('G28', ExecutionStatus.COMPLETED, 0.2))
+        await handler.history.add_entry(_history_entry('G0 X1', ExecutionStatus.FAILED, 0.1))
+        await openpnp_translator.enqueue_command(_MOVE_CMD)
         
-        # Get statistics
         stats = await openpnp_translator.get_statistics()
         
-        # Verify statistics
-        assert stats == expected_stats
-        openpnp_translator.get_statistics.assert_called_once()
+        assert stats['queue_size'] == 1
+        assert stats['history']['total'] == 2
+        assert stats['history']['completed'] == 1
+        assert stats['history']['failed'] == 1
+        assert stats['history']['success_rate'] == 50.0
+        assert stats['history']['avg_execution_time'] == 0.2
     
-    @pytest_asyncio.asyncio_test
     async def test_translator_get_history(self, openpnp_translator):
-        """Test that translator history can be retrieved."""
-        # Mock history
-        expected_history = [
-            {'command': 'move', 'status': 'success', 'timestamp': 1234567890.0},
-            {'command': 'pick', 'status': 'success', 'timestamp': 1234567891.0}
-        ]
-        openpnp_translator.get_history = AsyncMock(return_value=expected_history)
+        """Test that translator history returns the newest handler entries."""
+        handler = openpnp_translator._get_execution_handler()
+        for gcode in ('G28', 'G0 X1', 'G0 Y1'):
+            await handler.history.add_entry(_history_entry(gcode, ExecutionStatus.COMPLETED, 0.1))
         
-        # Get history
-        history = await openpnp_translator.get_history(limit=10)
+        history = await openpnp_translator.get_history(limit=2)
         
-        # Verify history
-        assert history == expected_history
-        openpnp_translator.get_history.assert_called_once_with(limit=10)
+        assert [entry['gcode'] for entry in history] == ['G0 X1', 'G0 Y1']
+        assert all(entry['status'] == ExecutionStatus.COMPLETED.value for entry in history)
     
-    @pytest_asyncio.asyncio_test
     async def test_translator_get_queue_info(self, openpnp_translator):
-        """Test that translator queue info can be retrieved."""
-        # Mock queue info
-        expected_queue_info = {
-            'queue_size': 5,
-            'processing': False,
-            'pending_commands': 5
-        }
-        openpnp_translator.get_queue_info = AsyncMock(return_value=expected_queue_info)
+        """Test that translator queue info lists enqueued commands."""
+        command_ids = [
+            await openpnp_translator.enqueue_command(_MOVE_CMD),
+            await openpnp_translator.enqueue_command(_GET_STATUS_CMD)
+        ]
         
-        # Get queue info
         queue_info = await openpnp_translator.get_queue_info()
         
-        # Verify queue info
-        assert queue_info == expected_queue_info
-        openpnp_translator.get_queue_info.assert_called_once()
+        assert queue_info['size'] == 2
+        assert sorted(entry['id'] for entry in queue_info['snapshot']) == sorted(command_ids)
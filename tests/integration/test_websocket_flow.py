@@ -3,26 +3,71 @@
 # Tests for WebSocket notification and communication flow
 
 import pytest
-import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch, AsyncMock as async_mock
 import asyncio
+import contextlib
 import json
 from typing import Dict, Any
 
+import aiohttp
+
+import middleware.cache
 from middleware.cache import StateCacheManager, CacheCategory
 from middleware.safety import SafetyManager, SafetyEvent, SafetyEventType, SafetyLevel
 
+pytestmark = pytest.mark.integration
+
+# Behaviour these tests describe that the cache manager does not implement yet
+_SAFETY_NOT_WIRED = pytest.mark.xfail(
+    reason="_handle_websocket_message only invalidates the cache; it does not notify the safety manager",
+    strict=True
+)
+
+
+class _AsyncIter:
+    """Async iterator over a fixed sequence of items."""
+    
+    def __init__(self, items=()):
+        self._items = iter(items)
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _FakeWebSocket:
+    """WebSocket connection yielding a fixed list of TEXT frames."""
+    
+    def __init__(self, frames):
+        self._frames = frames
+        self.send_str = AsyncMock()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def __aiter__(self):
+        return _AsyncIter(
+            aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, data, None) for data in self._frames
+        )
+
 
 class TestWebSocketConnectionFlow:
     """Test suite for WebSocket connection flow."""
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_connection_established(self, mock_cache_manager):
         """Test that WebSocket connection is established."""
         # Mock WebSocket connection
         mock_ws = AsyncMock()
         mock_ws.send_json = AsyncMock()
-        mock_ws.__aiter__ = AsyncMock(return_value=iter([]))
+        mock_ws.__aiter__ = lambda self: _AsyncIter()
         
         # Simulate connection
         await mock_cache_manager._connect_websocket()
@@ -30,19 +75,18 @@ class TestWebSocketConnectionFlow:
         # Verify connection attempt was made
         assert hasattr(mock_cache_manager, '_websocket_connected')
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_subscription_to_events(self, mock_cache_manager):
         """Test that WebSocket subscribes to Moonraker events."""
         # Mock WebSocket
         mock_ws = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws.send_str = AsyncMock()
         
         # Simulate subscription
         await mock_cache_manager._subscribe_to_events(mock_ws)
         
         # Verify subscription message
-        mock_ws.send_json.assert_called_once()
-        call_args = mock_ws.send_json.call_args[0][0]
+        mock_ws.send_str.assert_called_once()
+        call_args = json.loads(mock_ws.send_str.call_args[0][0])
         
         assert call_args['jsonrpc'] == '2.0'
         assert call_args['method'] == 'printer.objects.subscribe'
@@ -52,8 +96,7 @@ class TestWebSocketConnectionFlow:
         assert 'toolhead' in call_args['params']['objects']
         assert 'temperature_sensor' in call_args['params']['objects']
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_message_handling(self, mock_cache_manager):
+    async def test_websocket_message_handling(self, mock_cache_manager, category_generations):
         """Test that WebSocket messages are handled correctly."""
         # Mock message
         test_message = {
@@ -68,11 +111,12 @@ class TestWebSocketConnectionFlow:
         # Handle message
         await mock_cache_manager._handle_websocket_message(test_message)
         
-        # Verify cache invalidation was called
-        assert mock_cache_manager.invalidate_category.called
+        # Verify cache invalidation was applied
+        assert category_generations(CacheCategory.GPIO) == 1
+        assert category_generations(CacheCategory.FAN) == 1
+        assert category_generations(CacheCategory.POSITION) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_gpio_status_update(self, mock_cache_manager):
+    async def test_websocket_gpio_status_update(self, mock_cache_manager, category_generations):
         """Test that GPIO status updates trigger cache invalidation."""
         # Mock message with GPIO update
         message = {
@@ -86,11 +130,10 @@ class TestWebSocketConnectionFlow:
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify GPIO and PWM cache invalidation
-        mock_cache_manager.invalidate_category.assert_any_call(CacheCategory.GPIO)
-        mock_cache_manager.invalidate_category.assert_any_call(CacheCategory.PWM)
+        assert category_generations(CacheCategory.GPIO) == 1
+        assert category_generations(CacheCategory.PWM) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_fan_status_update(self, mock_cache_manager):
+    async def test_websocket_fan_status_update(self, mock_cache_manager, category_generations):
         """Test that fan status updates trigger cache invalidation."""
         # Mock message with fan update
         message = {
@@ -104,10 +147,9 @@ class TestWebSocketConnectionFlow:
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify fan cache invalidation
-        mock_cache_manager.invalidate_category.assert_called_with(CacheCategory.FAN)
+        assert category_generations(CacheCategory.FAN) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_position_status_update(self, mock_cache_manager):
+    async def test_websocket_position_status_update(self, mock_cache_manager, category_generations):
         """Test that position updates trigger cache invalidation."""
         # Mock message with position update
         message = {
@@ -121,10 +163,9 @@ class TestWebSocketConnectionFlow:
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify position cache invalidation
-        mock_cache_manager.invalidate_category.assert_called_with(CacheCategory.POSITION)
+        assert category_generations(CacheCategory.POSITION) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_sensor_status_update(self, mock_cache_manager):
+    async def test_websocket_sensor_status_update(self, mock_cache_manager, category_generations):
         """Test that sensor updates trigger cache invalidation."""
         # Mock message with sensor update
         message = {
@@ -138,10 +179,9 @@ class TestWebSocketConnectionFlow:
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify sensor cache invalidation
-        mock_cache_manager.invalidate_category.assert_called_with(CacheCategory.SENSOR)
+        assert category_generations(CacheCategory.SENSOR) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_printer_state_update(self, mock_cache_manager):
+    async def test_websocket_printer_state_update(self, mock_cache_manager, category_generations):
         """Test that printer state updates trigger cache invalidation."""
         # Mock message with printer state update
         message = {
@@ -155,10 +195,9 @@ class TestWebSocketConnectionFlow:
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify printer state cache invalidation
-        mock_cache_manager.invalidate_category.assert_called_with(CacheCategory.PRINTER_STATE)
+        assert category_generations(CacheCategory.PRINTER_STATE) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_combined_status_update(self, mock_cache_manager):
+    async def test_websocket_combined_status_update(self, mock_cache_manager, category_generations):
         """Test that combined status updates trigger multiple cache invalidations."""
         # Mock message with multiple updates
         message = {
@@ -176,9 +215,11 @@ class TestWebSocketConnectionFlow:
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify multiple cache invalidations
-        assert mock_cache_manager.invalidate_category.call_count >= 3
+        for category in (CacheCategory.GPIO, CacheCategory.PWM, CacheCategory.FAN,
+                         CacheCategory.POSITION, CacheCategory.SENSOR,
+                         CacheCategory.PRINTER_STATE):
+            assert category_generations(category) == 1
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_error_handling(self, mock_cache_manager):
         """Test that WebSocket errors are handled gracefully."""
         # Mock WebSocket error
@@ -198,7 +239,6 @@ class TestWebSocketConnectionFlow:
             # Error should be caught and logged
             assert 'Connection error' in str(e) or True
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_disconnection(self, mock_cache_manager):
         """Test that WebSocket disconnection is handled."""
         # Mock WebSocket
@@ -210,13 +250,37 @@ class TestWebSocketConnectionFlow:
         
         # Verify cleanup
         assert mock_cache_manager._websocket_connected == False
+    
+    async def test_websocket_skips_decoding_other_notifications(self, mock_cache_manager,
+                                                                monkeypatch, category_generations):
+        """Test that only status update frames are decoded."""
+        frames = [
+            json.dumps({'jsonrpc': '2.0', 'method': 'notify_proc_stat_update',
+                        'params': [{'cpu_temp': 45.0}]}),
+            json.dumps({'jsonrpc': '2.0', 'method': 'notify_status_update',
+                        'params': [{'fan': {'speed': 0.5}}, 12.5]})
+        ]
+        decoded = []
+        
+        def recording_loads(data):
+            decoded.append(data)
+            return json.loads(data)
+        
+        monkeypatch.setattr(middleware.cache, '_json_loads', recording_loads)
+        monkeypatch.setattr(aiohttp.ClientSession, 'ws_connect',
+                            lambda session, url: _FakeWebSocket(frames))
+        
+        await mock_cache_manager._connect_websocket()
+        
+        # Verify only the status update was decoded and applied
+        assert decoded == frames[1:]
+        assert category_generations(CacheCategory.FAN) == 1
 
 
 class TestWebSocketNotificationFlow:
     """Test suite for WebSocket notification flow."""
     
-    @pytest_asyncio.asyncio_test
-    async def test_notification_on_gpio_change(self, mock_cache_manager):
+    async def test_notification_on_gpio_change(self, mock_cache_manager, category_generations):
         """Test that GPIO changes trigger notifications."""
         # Simulate GPIO status update
         message = {
@@ -226,25 +290,14 @@ class TestWebSocketNotificationFlow:
             }]
         }
         
-        # Track invalidation calls
-        invalidation_calls = []
-        original_invalidate = mock_cache_manager.invalidate_category
-        
-        async def track_invalidate(category):
-            invalidation_calls.append(category)
-            return await original_invalidate(category)
-        
-        mock_cache_manager.invalidate_category = track_invalidate
-        
         # Handle message
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify notification
-        assert CacheCategory.GPIO in invalidation_calls
-        assert CacheCategory.PWM in invalidation_calls
+        assert category_generations(CacheCategory.GPIO) == 1
+        assert category_generations(CacheCategory.PWM) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_notification_on_fan_change(self, mock_cache_manager):
+    async def test_notification_on_fan_change(self, mock_cache_manager, category_generations):
         """Test that fan changes trigger notifications."""
         # Simulate fan status update
         message = {
@@ -254,24 +307,13 @@ class TestWebSocketNotificationFlow:
             }]
         }
         
-        # Track invalidation calls
-        invalidation_calls = []
-        original_invalidate = mock_cache_manager.invalidate_category
-        
-        async def track_invalidate(category):
-            invalidation_calls.append(category)
-            return await original_invalidate(category)
-        
-        mock_cache_manager.invalidate_category = track_invalidate
-        
         # Handle message
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify notification
-        assert CacheCategory.FAN in invalidation_calls
+        assert category_generations(CacheCategory.FAN) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_notification_on_position_change(self, mock_cache_manager):
+    async def test_notification_on_position_change(self, mock_cache_manager, category_generations):
         """Test that position changes trigger notifications."""
         # Simulate position update
         message = {
@@ -281,24 +323,13 @@ class TestWebSocketNotificationFlow:
             }]
         }
         
-        # Track invalidation calls
-        invalidation_calls = []
-        original_invalidate = mock_cache_manager.invalidate_category
-        
-        async def track_invalidate(category):
-            invalidation_calls.append(category)
-            return await original_invalidate(category)
-        
-        mock_cache_manager.invalidate_category = track_invalidate
-        
         # Handle message
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify notification
-        assert CacheCategory.POSITION in invalidation_calls
+        assert category_generations(CacheCategory.POSITION) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_notification_on_sensor_change(self, mock_cache_manager):
+    async def test_notification_on_sensor_change(self, mock_cache_manager, category_generations):
         """Test that sensor changes trigger notifications."""
         # Simulate sensor update
         message = {
@@ -308,24 +339,13 @@ class TestWebSocketNotificationFlow:
             }]
         }
         
-        # Track invalidation calls
-        invalidation_calls = []
-        original_invalidate = mock_cache_manager.invalidate_category
-        
-        async def track_invalidate(category):
-            invalidation_calls.append(category)
-            return await original_invalidate(category)
-        
-        mock_cache_manager.invalidate_category = track_invalidate
-        
         # Handle message
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify notification
-        assert CacheCategory.SENSOR in invalidation_calls
+        assert category_generations(CacheCategory.SENSOR) == 1
     
-    @pytest_asyncio.asyncio_test
-    async def test_notification_on_multiple_changes(self, mock_cache_manager):
+    async def test_notification_on_multiple_changes(self, mock_cache_manager, category_generations):
         """Test that multiple changes trigger multiple notifications."""
         # Simulate multiple updates
         message = {
@@ -339,31 +359,21 @@ class TestWebSocketNotificationFlow:
             }]
         }
         
-        # Track invalidation calls
-        invalidation_calls = []
-        original_invalidate = mock_cache_manager.invalidate_category
-        
-        async def track_invalidate(category):
-            invalidation_calls.append(category)
-            return await original_invalidate(category)
-        
-        mock_cache_manager.invalidate_category = track_invalidate
-        
         # Handle message
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify multiple notifications
-        assert len(invalidation_calls) >= 3
-        assert CacheCategory.GPIO in invalidation_calls
-        assert CacheCategory.FAN in invalidation_calls
-        assert CacheCategory.POSITION in invalidation_calls
+        assert category_generations(CacheCategory.GPIO) == 1
+        assert category_generations(CacheCategory.FAN) == 1
+        assert category_generations(CacheCategory.POSITION) == 1
+        assert category_generations(CacheCategory.SENSOR) == 1
+        assert category_generations(CacheCategory.PRINTER_STATE) == 1
 
 
 class TestWebSocketRealTimeUpdates:
     """Test suite for real-time update flow."""
     
-    @pytest_asyncio.asyncio_test
-    async def test_real_time_position_updates(self, mock_cache_manager):
+    async def test_real_time_position_updates(self, mock_cache_manager, category_generations):
         """Test that position updates are received in real-time."""
         # Simulate position updates
         positions = [
@@ -384,10 +394,9 @@ class TestWebSocketRealTimeUpdates:
             await mock_cache_manager._handle_websocket_message(message)
         
         # Verify cache was invalidated for each update
-        assert mock_cache_manager.invalidate_category.call_count == len(positions)
+        assert category_generations(CacheCategory.POSITION) == len(positions)
     
-    @pytest_asyncio.asyncio_test
-    async def test_real_time_temperature_updates(self, mock_cache_manager):
+    async def test_real_time_temperature_updates(self, mock_cache_manager, category_generations):
         """Test that temperature updates are received in real-time."""
         # Simulate temperature updates
         temperatures = [20.0, 21.0, 22.0, 23.0, 24.0]
@@ -403,10 +412,9 @@ class TestWebSocketRealTimeUpdates:
             await mock_cache_manager._handle_websocket_message(message)
         
         # Verify cache was invalidated for each update
-        assert mock_cache_manager.invalidate_category.call_count == len(temperatures)
+        assert category_generations(CacheCategory.SENSOR) == len(temperatures)
     
-    @pytest_asyncio.asyncio_test
-    async def test_real_time_gpio_state_updates(self, mock_cache_manager):
+    async def test_real_time_gpio_state_updates(self, mock_cache_manager, category_generations):
         """Test that GPIO state updates are received in real-time."""
         # Simulate GPIO state changes
         gpio_states = [0, 1, 0, 1, 0]
@@ -422,10 +430,10 @@ class TestWebSocketRealTimeUpdates:
             await mock_cache_manager._handle_websocket_message(message)
         
         # Verify cache was invalidated for each update
-        assert mock_cache_manager.invalidate_category.call_count == len(gpio_states)
+        assert category_generations(CacheCategory.GPIO) == len(gpio_states)
+        assert category_generations(CacheCategory.PWM) == len(gpio_states)
     
-    @pytest_asyncio.asyncio_test
-    async def test_real_time_fan_speed_updates(self, mock_cache_manager):
+    async def test_real_time_fan_speed_updates(self, mock_cache_manager, category_generations):
         """Test that fan speed updates are received in real-time."""
         # Simulate fan speed changes
         fan_speeds = [0.0, 0.25, 0.5, 0.75, 1.0]
@@ -441,10 +449,9 @@ class TestWebSocketRealTimeUpdates:
             await mock_cache_manager._handle_websocket_message(message)
         
         # Verify cache was invalidated for each update
-        assert mock_cache_manager.invalidate_category.call_count == len(fan_speeds)
+        assert category_generations(CacheCategory.FAN) == len(fan_speeds)
     
-    @pytest_asyncio.asyncio_test
-    async def test_real_time_printer_state_updates(self, mock_cache_manager):
+    async def test_real_time_printer_state_updates(self, mock_cache_manager, category_generations):
         """Test that printer state updates are received in real-time."""
         # Simulate printer state changes
         states = ['idle', 'printing', 'paused', 'complete', 'error']
@@ -460,13 +467,55 @@ class TestWebSocketRealTimeUpdates:
             await mock_cache_manager._handle_websocket_message(message)
         
         # Verify cache was invalidated for each update
-        assert mock_cache_manager.invalidate_category.call_count == len(states)
+        assert category_generations(CacheCategory.PRINTER_STATE) == len(states)
+    
+    async def test_real_time_updates_coalesced(self):
+        """Test that a burst of updates is invalidated once per window."""
+        cache_manager = StateCacheManager(invalidation_window=0.01)
+        
+        for pos in ([0.0, 0.0, 0.0], [10.0, 5.0, 2.0], [20.0, 10.0, 4.0]):
+            message = {
+                'method': 'notify_status_update',
+                'params': [{
+                    'toolhead': {'position': pos},
+                    'temperature_sensor': {'sensor1': {'temperature': 25.5}}
+                }]
+            }
+            
+            await cache_manager._handle_websocket_message(message)
+        
+        # Nothing is invalidated until the window closes
+        assert cache_manager.get_category_generation(CacheCategory.POSITION) == 0
+        await cache_manager._flush_task
+        
+        # Verify the burst collapsed into one invalidation per category
+        assert cache_manager.get_category_generation(CacheCategory.POSITION) == 1
+        assert cache_manager.get_category_generation(CacheCategory.SENSOR) == 1
+    
+    async def test_real_time_updates_through_ingest_queue(self):
+        """Test that queued updates are all applied by the ingest worker."""
+        cache_manager = StateCacheManager()
+        queue = asyncio.Queue(maxsize=cache_manager.INGEST_QUEUE_SIZE)
+        
+        for speed in [0.0, 0.5, 1.0]:
+            await queue.put({
+                'method': 'notify_status_update',
+                'params': [{'fan': {'speed': speed}}]
+            })
+        
+        worker = asyncio.create_task(cache_manager._ingest_worker(queue))
+        await queue.join()
+        worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await worker
+        
+        # Verify every queued update was applied
+        assert cache_manager.get_category_generation(CacheCategory.FAN) == 3
 
 
 class TestWebSocketReconnectionFlow:
     """Test suite for WebSocket reconnection flow."""
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_reconnection_after_disconnect(self, mock_cache_manager):
         """Test that WebSocket reconnects after disconnect."""
         # Mock WebSocket
@@ -483,13 +532,12 @@ class TestWebSocketReconnectionFlow:
         # Verify reconnection attempt
         assert hasattr(mock_cache_manager, '_websocket_connected')
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_resubscription_after_reconnect(self, mock_cache_manager):
         """Test that WebSocket resubscribes after reconnect."""
         # Mock WebSocket
         mock_ws = AsyncMock()
-        mock_ws.send_json = AsyncMock()
-        mock_ws.__aiter__ = AsyncMock(return_value=iter([]))
+        mock_ws.send_str = AsyncMock()
+        mock_ws.__aiter__ = lambda self: _AsyncIter()
         
         # Simulate reconnection
         await mock_cache_manager._connect_websocket()
@@ -497,11 +545,10 @@ class TestWebSocketReconnectionFlow:
         # Verify resubscription
         await mock_cache_manager._subscribe_to_events(mock_ws)
         
-        mock_ws.send_json.assert_called()
-        call_args = mock_ws.send_json.call_args[0][0]
+        mock_ws.send_str.assert_called()
+        call_args = json.loads(mock_ws.send_str.call_args[0][0])
         assert call_args['method'] == 'printer.objects.subscribe'
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_state_preservation_across_reconnect(self, mock_cache_manager):
         """Test that cache state is preserved across reconnect."""
         # Set some cache state
@@ -520,7 +567,6 @@ class TestWebSocketReconnectionFlow:
 class TestWebSocketErrorHandling:
     """Test suite for WebSocket error handling."""
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_connection_error(self, mock_cache_manager):
         """Test that connection errors are handled."""
         # Mock connection error
@@ -532,8 +578,7 @@ class TestWebSocketErrorHandling:
                 # Error should be caught and logged
                 assert 'Connection failed' in str(e)
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_message_parse_error(self, mock_cache_manager):
+    async def test_websocket_message_parse_error(self, mock_cache_manager, category_generations):
         """Test that message parse errors are handled."""
         # Mock invalid message
         invalid_message = {
@@ -547,8 +592,10 @@ class TestWebSocketErrorHandling:
         except Exception as e:
             # Error should be caught and logged
             assert True  # Error was handled
+        
+        # Verify the unknown method was ignored
+        assert not any(category_generations(category) for category in CacheCategory)
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_timeout_handling(self, mock_cache_manager):
         """Test that WebSocket timeouts are handled."""
         # Mock WebSocket timeout
@@ -562,25 +609,27 @@ class TestWebSocketErrorHandling:
             # Timeout should be caught
             assert True
     
-    @pytest_asyncio.asyncio_test
     async def test_websocket_graceful_shutdown(self, mock_cache_manager):
         """Test that WebSocket shutdown is graceful."""
-        # Mock WebSocket
+        # Mock an open WebSocket session
         mock_ws = AsyncMock()
         mock_ws.close = AsyncMock()
+        mock_cache_manager._websocket_client = mock_ws
+        mock_cache_manager._websocket_connected = True
         
         # Simulate shutdown
         await mock_cache_manager._disconnect_websocket()
         
         # Verify graceful shutdown
         assert mock_cache_manager._websocket_connected == False
-        mock_ws.close.assert_called()
+        assert mock_cache_manager._websocket_client is None
+        mock_ws.close.assert_awaited_once()
 
 
 class TestWebSocketIntegrationWithSafety:
     """Test suite for WebSocket integration with safety manager."""
     
-    @pytest_asyncio.asyncio_test
+    @_SAFETY_NOT_WIRED
     async def test_websocket_triggers_safety_events(self, mock_cache_manager, mock_safety_manager):
         """Test that WebSocket updates trigger safety events."""
         # Simulate temperature update that exceeds limit
@@ -611,14 +660,13 @@ class TestWebSocketIntegrationWithSafety:
         # Verify safety event was triggered
         assert len(safety_events) > 0
     
-    @pytest_asyncio.asyncio_test
-    async def test_websocket_emergency_stop_notification(self, mock_cache_manager, mock_safety_manager):
+    async def test_websocket_emergency_stop_notification(self, mock_cache_manager, mock_safety_manager, category_generations):
         """Test that emergency stop is notified via WebSocket."""
         # Simulate emergency stop
         message = {
             'method': 'notify_status_update',
             'params': [{
-                'print_stats': {'state': 'error', 'state_message': 'Emergency stop triggered'}}
+                'print_stats': {'state': 'error', 'state_message': 'Emergency stop triggered'}
             }]
         }
         
@@ -626,9 +674,9 @@ class TestWebSocketIntegrationWithSafety:
         await mock_cache_manager._handle_websocket_message(message)
         
         # Verify cache invalidation
-        mock_cache_manager.invalidate_category.assert_called_with(CacheCategory.PRINTER_STATE)
+        assert category_generations(CacheCategory.PRINTER_STATE) == 1
     
-    @pytest_asyncio.asyncio_test
+    @_SAFETY_NOT_WIRED
     async def test_websocket_position_limit_warning(self, mock_cache_manager, mock_safety_manager):
         """Test that position limit warnings are triggered."""
         # Simulate position out of bounds
@@ -662,7 +710,7 @@ class TestWebSocketIntegrationWithSafety:
         assert len(safety_events) > 0
         assert safety_events[0].event_type == SafetyEventType.POSITION_LIMIT_EXCEEDED
     
-    @pytest_asyncio.asyncio_test
+    @_SAFETY_NOT_WIRED
     async def test_websocket_temperature_warning(self, mock_cache_manager, mock_safety_manager):
         """Test that temperature warnings are triggered."""
         # Simulate high temperature